@@ -16,18 +16,18 @@ from typing import Dict
 
 
 def create_sectionA_agent() -> Dict[str, str]:
-    """Return prompt payload for Section A extraction using simple key-value array format."""
+    """Return prompt payload for Section A extraction using a flat key-value object format."""
     role = "BRSR Section A Extraction Specialist"
-    goal = "Extract Section A fields and return a JSON array of key-value pairs"
+    goal = "Extract Section A fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are an assistant that MUST output only valid JSON.\n\n"
-        "Extract the following fields from the company data and output a JSON array of objects:\n"
-        '[{"key": "<field_key>", "value": "<extracted_value>"}]\n\n'
+        "Extract the following fields from the company data and output a flat JSON object mapping each field key to its value:\n"
+        '{"<field_key>": "<extracted_value>", ...}\n\n'
         "RULES:\n"
         "- Only include fields you can extract exactly from the text\n"
         "- If a value is absent, use null or empty string\n"
         "- Do NOT add commentary or explanations\n"
-        "- Output MUST be valid JSON array\n"
+        "- Output MUST be a valid JSON object\n"
         "- For numbers, return as strings (e.g., \"3424\" not 3424)\n"
         "- For arrays/tables, return as JSON string array\n"
         "- Do NOT wrap output in markdown code blocks (no ``` or ```json)\n\n"
@@ -73,37 +73,37 @@ def create_sectionA_agent() -> Dict[str, str]:
         "sectiona_complaints_valuechain_filed, sectiona_complaints_valuechain_pending, sectiona_complaints_valuechain_remarks, "
         "sectiona_materialIssues_array (JSON array - extract ALL material issues with their details including rationale, mitigation approach, and financial implications)\n\n"
         "Example output format:\n"
-        '[\n'
-        '  {"key": "sectiona_cin", "value": "L17111PB1973PLC003345"},\n'
-        '  {"key": "sectiona_entityName", "value": "Vardhman Textiles Limited"},\n'
-        '  {"key": "sectiona_stockExchanges", "value": "BSE, NSE"},\n'
-        '  {"key": "sectiona_businessActivities_array", "value": "[{\\"mainActivity\\":\\"Textile Manufacturing\\",\\"businessDescription\\":\\"Manufacturing of different types of yarn & fabric and garments\\",\\"turnoverPercent\\":\\"99.60\\"}]"},\n'
-        '  {"key": "sectiona_products_array", "value": "[{\\"name\\":\\"Yarn, Fabric & Garments\\",\\"nicCode\\":\\"131\\",\\"turnoverPercent\\":\\"99.60\\"}]"},\n'
-        '  {"key": "sectiona_subsidiaries", "value": "1. Vardhman Acrylics Limited (Subsidiary) 2. VTL Investments Limited (Subsidiary) 3. Vardhman Special Steels Limited (Associate)"},\n'
-        '  {"key": "sectiona_csr_prescribedAmount", "value": "185.88 Crores"},\n'
-        '  {"key": "sectiona_nationalPlants", "value": "15"},\n'
-        '  {"key": "sectiona_employees_permanent_male", "value": "3424"}\n'
-        ']\n'
+        '{\n'
+        '  "sectiona_cin": "L17111PB1973PLC003345",\n'
+        '  "sectiona_entityName": "Vardhman Textiles Limited",\n'
+        '  "sectiona_stockExchanges": "BSE, NSE",\n'
+        '  "sectiona_businessActivities_array": "[{\\"mainActivity\\":\\"Textile Manufacturing\\",\\"businessDescription\\":\\"Manufacturing of different types of yarn & fabric and garments\\",\\"turnoverPercent\\":\\"99.60\\"}]",\n'
+        '  "sectiona_products_array": "[{\\"name\\":\\"Yarn, Fabric & Garments\\",\\"nicCode\\":\\"131\\",\\"turnoverPercent\\":\\"99.60\\"}]",\n'
+        '  "sectiona_subsidiaries": "1. Vardhman Acrylics Limited (Subsidiary) 2. VTL Investments Limited (Subsidiary) 3. Vardhman Special Steels Limited (Associate)",\n'
+        '  "sectiona_csr_prescribedAmount": "185.88 Crores",\n'
+        '  "sectiona_nationalPlants": "15",\n'
+        '  "sectiona_employees_permanent_male": "3424"\n'
+        '}\n'
     )
 
     return {"role": role, "goal": goal, "prompt": prompt}
 
 
 def create_sectionB_agent() -> Dict[str, str]:
-    """Return prompt payload for Section B extraction using simple key-value array format.
+    """Return prompt payload for Section B extraction using a flat key-value object format.
     Note: Only extracts ALL Section B fields from PDF. Manual input form only allows Policy Matrix + policyWebLink.
     """
     role = "BRSR Section B Extraction Specialist"
-    goal = "Extract Section B governance & policy fields and return a JSON array of key-value pairs"
+    goal = "Extract Section B governance & policy fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are an assistant that MUST output only valid JSON.\n\n"
-        "Extract the following fields from the company data and output a JSON array of objects:\n"
-        '[{"key": "<field_key>", "value": "<extracted_value>"}]\n\n'
+        "Extract the following fields from the company data and output a flat JSON object mapping each field key to its value:\n"
+        '{"<field_key>": "<extracted_value>", ...}\n\n'
         "RULES:\n"
         "- Only include fields you can extract exactly from the text\n"
         "- If a value is absent, use null or empty string\n"
         "- Do NOT add commentary or explanations\n"
-        "- Output MUST be valid JSON array\n"
+        "- Output MUST be a valid JSON object\n"
         "- For Yes/No fields, use 'Y' or 'N' strings\n"
         "- For URLs, return full http/https link\n"
         "- Do NOT wrap output in markdown code blocks (no ``` or ```json)\n\n"
@@ -153,37 +153,42 @@ def create_sectionB_agent() -> Dict[str, str]:
         "sectionb_independentAssessment_p7, sectionb_independentAssessment_p8, sectionb_independentAssessment_p9\n\n"
         "Q12. No Policy Reasons (if answer to Q1 is No):\n"
         "For each principle, extract reason why policy is not covered:\n"
-        "sectionb_noPolicyReasons_notMaterial_p1 through p9 (not material to business - Y/N),\n"
-        "sectionb_noPolicyReasons_notReady_p1 through p9 (not ready to formulate - Y/N),\n"
-        "sectionb_noPolicyReasons_noResources_p1 through p9 (no resources - Y/N),\n"
-        "sectionb_noPolicyReasons_plannedNextYear_p1 through p9 (planned next year - Y/N),\n"
-        "sectionb_noPolicyReasons_otherReason_p1 through p9 (other reason text)\n\n"
+        "sectionb_noPolicyReasons_notMaterial_p1, sectionb_noPolicyReasons_notMaterial_p2, sectionb_noPolicyReasons_notMaterial_p3, sectionb_noPolicyReasons_notMaterial_p4, sectionb_noPolicyReasons_notMaterial_p5, "
+        "sectionb_noPolicyReasons_notMaterial_p6, sectionb_noPolicyReasons_notMaterial_p7, sectionb_noPolicyReasons_notMaterial_p8, sectionb_noPolicyReasons_notMaterial_p9 (not material to business - Y/N),\n"
+        "sectionb_noPolicyReasons_notReady_p1, sectionb_noPolicyReasons_notReady_p2, sectionb_noPolicyReasons_notReady_p3, sectionb_noPolicyReasons_notReady_p4, sectionb_noPolicyReasons_notReady_p5, "
+        "sectionb_noPolicyReasons_notReady_p6, sectionb_noPolicyReasons_notReady_p7, sectionb_noPolicyReasons_notReady_p8, sectionb_noPolicyReasons_notReady_p9 (not ready to formulate - Y/N),\n"
+        "sectionb_noPolicyReasons_noResources_p1, sectionb_noPolicyReasons_noResources_p2, sectionb_noPolicyReasons_noResources_p3, sectionb_noPolicyReasons_noResources_p4, sectionb_noPolicyReasons_noResources_p5, "
+        "sectionb_noPolicyReasons_noResources_p6, sectionb_noPolicyReasons_noResources_p7, sectionb_noPolicyReasons_noResources_p8, sectionb_noPolicyReasons_noResources_p9 (no resources - Y/N),\n"
+        "sectionb_noPolicyReasons_plannedNextYear_p1, sectionb_noPolicyReasons_plannedNextYear_p2, sectionb_noPolicyReasons_plannedNextYear_p3, sectionb_noPolicyReasons_plannedNextYear_p4, sectionb_noPolicyReasons_plannedNextYear_p5, "
+        "sectionb_noPolicyReasons_plannedNextYear_p6, sectionb_noPolicyReasons_plannedNextYear_p7, sectionb_noPolicyReasons_plannedNextYear_p8, sectionb_noPolicyReasons_plannedNextYear_p9 (planned next year - Y/N),\n"
+        "sectionb_noPolicyReasons_otherReason_p1, sectionb_noPolicyReasons_otherReason_p2, sectionb_noPolicyReasons_otherReason_p3, sectionb_noPolicyReasons_otherReason_p4, sectionb_noPolicyReasons_otherReason_p5, "
+        "sectionb_noPolicyReasons_otherReason_p6, sectionb_noPolicyReasons_otherReason_p7, sectionb_noPolicyReasons_otherReason_p8, sectionb_noPolicyReasons_otherReason_p9 (other reason text)\n\n"
         "Example output format:\n"
-        '[\n'
-        '  {"key": "sectionb_policymatrix_p1_hasPolicy", "value": "Y"},\n'
-        '  {"key": "sectionb_policymatrix_p1_approvedByBoard", "value": "Y"},\n'
-        '  {"key": "sectionb_policymatrix_p1_webLink", "value": "https://example.com/policy"},\n'
-        '  {"key": "sectionb_policyWebLink", "value": "Various policies available at https://example.com"},\n'
-        '  {"key": "sectionb_valueChainExtension", "value": "Yes, policies extend to suppliers"},\n'
-        '  {"key": "sectionb_directorStatement", "value": "Full statement text..."}\n'
-        ']\n'
+        '{\n'
+        '  "sectionb_policymatrix_p1_hasPolicy": "Y",\n'
+        '  "sectionb_policymatrix_p1_approvedByBoard": "Y",\n'
+        '  "sectionb_policymatrix_p1_webLink": "https://example.com/policy",\n'
+        '  "sectionb_policyWebLink": "Various policies available at https://example.com",\n'
+        '  "sectionb_valueChainExtension": "Yes, policies extend to suppliers",\n'
+        '  "sectionb_directorStatement": "Full statement text..."\n'
+        '}\n'
     )
     return {"role": role, "goal": goal, "prompt": prompt}
 
 
 def create_principles_1_2_agent() -> Dict[str, str]:
-    """Return prompt payload covering Principle 1 and Principle 2 using simple key-value array format."""
+    """Return prompt payload covering Principle 1 and Principle 2 using a flat key-value object format."""
     role = "BRSR Principles 1&2 Extraction Specialist"
-    goal = "Extract Principle 1 and Principle 2 fields and return a JSON array of key-value pairs"
+    goal = "Extract Principle 1 and Principle 2 fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are an assistant that MUST output only valid JSON.\n\n"
-        "Extract the following fields from the company data and output a JSON array of objects:\n"
-        '[{"key": "<field_key>", "value": "<extracted_value>"}]\n\n'
+        "Extract the following fields from the company data and output a flat JSON object mapping each field key to its value:\n"
+        '{"<field_key>": "<extracted_value>", ...}\n\n'
         "RULES:\n"
         "- Only include fields you can extract exactly from the text\n"
         "- If a value is absent, use null or empty string\n"
         "- Do NOT add commentary or explanations\n"
-        "- Output MUST be valid JSON array\n"
+        "- Output MUST be a valid JSON object\n"
         "- For numbers/counts, return as strings\n"
         "- For arrays, return as JSON string array\n"
         "- Do NOT wrap output in markdown code blocks (no ``` or ```json)\n\n"
@@ -365,28 +370,28 @@ def create_principles_1_2_agent() -> Dict[str, str]:
         "sectionc_principle2_leadership_q4_productsreclaimed_otherwaste_previousfy_safelydisposed, "
         "sectionc_principle2_leadership_q5_reclaimedpercentage\n\n"
         "Example output format:\n"
-        '[\n'
-        '  {"key": "sectionc_principle1_essential_q1_percentagecoveredbytraining_boardofdirectors_totalprogrammes", "value": "5"},\n'
-        '  {"key": "sectionc_principle1_essential_q4_anticorruptionpolicy_exists", "value": "Yes"},\n'
-        '  {"key": "sectionc_principle2_essential_q1_rdcapexinvestments_rd_currentfy", "value": "150.5"}\n'
-        ']\n'
+        '{\n'
+        '  "sectionc_principle1_essential_q1_percentagecoveredbytraining_boardofdirectors_totalprogrammes": "5",\n'
+        '  "sectionc_principle1_essential_q4_anticorruptionpolicy_exists": "Yes",\n'
+        '  "sectionc_principle2_essential_q1_rdcapexinvestments_rd_currentfy": "150.5"\n'
+        '}\n'
     )
     return {"role": role, "goal": goal, "prompt": prompt}
 
 
 def create_principles_3_4_agent() -> Dict[str, str]:
-    """Return prompt payload covering Principle 3 and Principle 4 using simple key-value array format."""
+    """Return prompt payload covering Principle 3 and Principle 4 using a flat key-value object format."""
     role = "BRSR Principles 3&4 Extraction Specialist"
-    goal = "Extract Principle 3 and 4 fields and return a JSON array of key-value pairs"
+    goal = "Extract Principle 3 and 4 fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are an assistant that MUST output only valid JSON.\n\n"
-        "Extract the following fields from the company data and output a JSON array of objects:\n"
-        '[{"key": "<field_key>", "value": "<extracted_value>"}]\n\n'
+        "Extract the following fields from the company data and output a flat JSON object mapping each field key to its value:\n"
+        '{"<field_key>": "<extracted_value>", ...}\n\n'
         "RULES:\n"
         "- Only include fields you can extract exactly from the text\n"
         "- If a value is absent, use null or empty string\n"
         "- Do NOT add commentary or explanations\n"
-        "- Output MUST be valid JSON array\n"
+        "- Output MUST be a valid JSON object\n"
         "- Do NOT wrap output in markdown code blocks (no ``` or ```json)\n\n"
         "═══════════════════════════════════════════════════════════════════════════\n"
         "PRINCIPLE 3: Businesses should respect and promote the well-being of all employees, including those in their value chains\n"
@@ -626,11 +631,11 @@ def create_principles_3_4_agent() -> Dict[str, str]:
         "Extract: sectionc_principle4_leadership_q3_vulnerableengagement_array (JSON array of objects with fields: vulnerableGroup, concerns, actionTaken)\n"
         "Example: [{\"vulnerableGroup\":\"Disabled employees\",\"concerns\":\"Accessibility\",\"actionTaken\":\"Ramps installed\"}]\n\n"
         "Example output format:\n"
-        '[\n'
-        '  {"key": "sectionc_principle3_essential_q1a_employeewellbeing_permanentmale_total", "value": "1500"},\n'
-        '  {"key": "sectionc_principle3_essential_q2_retirementbenefits_pf_currentfy_employeespercent", "value": "92.5"},\n'
-        '  {"key": "sectionc_principle4_essential_q1_stakeholderidentification", "value": "Stakeholders identified through materiality assessment"}\n'
-        ']\n'
+        '{\n'
+        '  "sectionc_principle3_essential_q1a_employeewellbeing_permanentmale_total": "1500",\n'
+        '  "sectionc_principle3_essential_q2_retirementbenefits_pf_currentfy_employeespercent": "92.5",\n'
+        '  "sectionc_principle4_essential_q1_stakeholderidentification": "Stakeholders identified through materiality assessment"\n'
+        '}\n'
     )
     return {"role": role, "goal": goal, "prompt": prompt}
 
@@ -638,7 +643,7 @@ def create_principles_3_4_agent() -> Dict[str, str]:
 def create_principles_5_6_agent() -> Dict[str, str]:
     """Return prompt payload covering Principle 5 and Principle 6 with comprehensive BRSR format."""
     role = "BRSR Principles 5&6 Extraction Specialist"
-    goal = "Extract Principle 5 and 6 fields and return a JSON array of key-value pairs"
+    goal = "Extract Principle 5 and 6 fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are a BRSR (Business Responsibility and Sustainability Report) extraction specialist.\n"
         "Extract data for Section C: PRINCIPLE-WISE PERFORMANCE DISCLOSURE - PRINCIPLES 5 & 6.\n\n"
@@ -839,18 +844,18 @@ def create_principles_5_6_agent() -> Dict[str, str]:
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
         "OUTPUT FORMAT:\n"
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        "Return ONLY a JSON array of objects. Each object must have exactly two properties: \"key\" and \"value\".\n"
-        "For tables, extract EACH CELL as a separate object.\n"
-        "For text fields, extract as \"key\":\"field_name\", \"value\":\"extracted text\".\n"
+        "Return ONLY a flat JSON object mapping each field key to its value.\n"
+        "For tables, extract EACH CELL as a separate key.\n"
+        "For text fields, extract as \"field_name\": \"extracted text\".\n"
         "For numeric/percentage fields, include the unit/% symbol in the value.\n"
-        "For arrays (_array suffix), extract as JSON array string in the value field.\n"
+        "For arrays (_array suffix), extract as JSON array string in the value.\n"
         "Always return valid JSON. Do not add explanations or comments.\n\n"
         "Example output:\n"
-        "[\n"
-        "  {\"key\": \"sectionc_principle5_essential_q1_remuneration_employees_permanent_total\", \"value\": \"500\"},\n"
-        "  {\"key\": \"sectionc_principle6_essential_q1_energyconsumption_renewable_electricity_currentfy\", \"value\": \"1500 MWh\"},\n"
-        "  {\"key\": \"sectionc_principle6_essential_q6_airemissions_nox_unit\", \"value\": \"kg\"}\n"
-        "]\n"
+        "{\n"
+        "  \"sectionc_principle5_essential_q1_remuneration_employees_permanent_total\": \"500\",\n"
+        "  \"sectionc_principle6_essential_q1_energyconsumption_renewable_electricity_currentfy\": \"1500 MWh\",\n"
+        "  \"sectionc_principle6_essential_q6_airemissions_nox_unit\": \"kg\"\n"
+        "}\n"
     )
     return {"role": role, "goal": goal, "prompt": prompt}
 
@@ -858,7 +863,7 @@ def create_principles_5_6_agent() -> Dict[str, str]:
 def create_principles_7_8_9_agent() -> Dict[str, str]:
     """Return prompt payload covering Principles 7, 8 and 9 with comprehensive BRSR format."""
     role = "BRSR Principles 7,8,9 Extraction Specialist"
-    goal = "Extract Principles 7, 8 and 9 fields and return a JSON array of key-value pairs"
+    goal = "Extract Principles 7, 8 and 9 fields and return a flat JSON object of key-value pairs"
     prompt = (
         "You are a BRSR (Business Responsibility and Sustainability Report) extraction specialist.\n"
         "Extract data for Section C: PRINCIPLE-WISE PERFORMANCE DISCLOSURE - PRINCIPLES 7, 8 & 9.\n\n"
@@ -990,18 +995,18 @@ def create_principles_7_8_9_agent() -> Dict[str, str]:
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
         "OUTPUT FORMAT:\n"
         "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        "Return ONLY a JSON array of objects. Each object must have exactly two properties: \"key\" and \"value\".\n"
-        "For tables, extract EACH CELL as a separate object.\n"
-        "For text fields, extract as \"key\":\"field_name\", \"value\":\"extracted text\".\n"
+        "Return ONLY a flat JSON object mapping each field key to its value.\n"
+        "For tables, extract EACH CELL as a separate key.\n"
+        "For text fields, extract as \"field_name\": \"extracted text\".\n"
         "For numeric/percentage fields, include the unit/% symbol in the value.\n"
-        "For arrays (_array suffix), extract as JSON array string in the value field.\n"
+        "For arrays (_array suffix), extract as JSON array string in the value.\n"
         "Always return valid JSON. Do not add explanations or comments.\n\n"
         "Example output:\n"
-        "[\n"
-        "  {\"key\": \"sectionc_principle7_essential_q1a_numberofaffiliations\", \"value\": \"15\"},\n"
-        "  {\"key\": \"sectionc_principle8_essential_q4_inputmaterialsourcing_msmes_currentfy\", \"value\": \"45%\"},\n"
-        "  {\"key\": \"sectionc_principle9_essential_q3_consumercomplaints_dataprivacy_currentfy_received\", \"value\": \"10\"}\n"
-        "]\n"
+        "{\n"
+        "  \"sectionc_principle7_essential_q1a_numberofaffiliations\": \"15\",\n"
+        "  \"sectionc_principle8_essential_q4_inputmaterialsourcing_msmes_currentfy\": \"45%\",\n"
+        "  \"sectionc_principle9_essential_q3_consumercomplaints_dataprivacy_currentfy_received\": \"10\"\n"
+        "}\n"
     )
     return {"role": role, "goal": goal, "prompt": prompt}
 
@@ -3,7 +3,7 @@ FastAPI Backend for BRSR Report Generation with Chunked Gemini API Calls.
 
 This module provides a focused, working implementation that:
 - sources prompts from `agents.py`
-- extracts text from PDF/XLSX via `pdfplumber`/`openpyxl` (if installed)
+- extracts text from PDF/XLSX via `pypdfium2` (or `pdfplumber`)/`openpyxl` (if installed)
 - sends chunked prompts to Gemini (`google.generativeai`) when configured
 - merges chunk responses into final BRSR JSON using `BRSR_DATA_SKELETON` from `data.py`.
 - transforms Gemini's flat output keys to nested frontend structure using `transform.py`
@@ -13,14 +13,24 @@ Run: uvicorn fastapi_brsr_backend:app --reload --port 8000
 
 import io
 import os
+import sys
 import re
 import json
 import time
+import threading
+import logging
+import logging.handlers
 import asyncio
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, List
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
 
@@ -30,7 +40,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import transformation utilities
-from transform import transform_flat_to_nested, merge_nested_data
+from transform import transform_flat_to_nested, merge_nested_data, precompute_paths
+# One orjson-with-stdlib-fallback JSON implementation, shared with transform.py
+from transform import dump_bytes as _json_bytes, loads as _json_loads
 
 # Import agents (centralized prompts)
 from agents import (
@@ -46,6 +58,15 @@ from agents import (
 from data import BRSR_DATA_SKELETON
 
 # Optional libs
+try:
+    import pypdfium2 as pdfium
+except Exception:
+    pdfium = None
+
+# PDFium is not thread-safe and PDFs are extracted on the worker-thread pool, so every
+# pdfium call (open, page loads, text pages, close) happens under this lock
+_pdfium_lock = threading.Lock()
+
 try:
     import pdfplumber
 except Exception:
@@ -56,6 +77,16 @@ try:
 except Exception:
     openpyxl = None
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import json_repair
+except Exception:
+    json_repair = None
+
 try:
     import google.generativeai as genai
     from google.generativeai.types import HarmCategory, HarmBlockThreshold
@@ -69,6 +100,11 @@ try:
 except Exception:
     openpyxl = None
 
+try:
+    from google.api_core.exceptions import ResourceExhausted
+except Exception:
+    ResourceExhausted = ()  # An empty tuple matches nothing in an `except` clause
+
 # Optional Gemini client
 try:
     import google.generativeai as genai
@@ -82,6 +118,16 @@ except Exception:
 app = FastAPI(title="BRSR Report Generator API")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
+# Worker threads for blocking work run via asyncio.to_thread (PDF/Excel parsing, Gemini calls)
+THREAD_POOL_WORKERS = int(os.getenv("BRSR_THREAD_WORKERS", "16"))
+
+
+@app.on_event("startup")
+async def configure_thread_pool():
+    """Size the loop's default executor so parallel uploads can parse side by side."""
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS))
+
+
 GEMINI_CONFIG = {
     # Model options (in order of capability vs cost):
     # - "gemini-2.5-flash" (recommended) - Best accuracy for complex BRSR extraction
@@ -90,137 +136,246 @@ GEMINI_CONFIG = {
     "model": os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite"),  # Change to "gemini-2.5-flash-lite" to test
     "max_retries": 3,
     "retry_delay_base": 2,
-    "delay_between_chunks": 1,  # Minimal delay for paid tier (360 req/min)
     "max_input_tokens": 800000,  # Increased to 800K tokens (~3.2M chars) - Gemini 2.5 Flash supports 1M tokens
     "max_output_tokens": 32768,
+    "prompt_token_reserve": 20000,  # Tokens kept free for instructions, chunk spec and manual context
     "requests_per_minute": 360,  # Paid tier: 360 requests/min
-    "enable_parallel_processing": True,  # Set to False to revert to sequential
+    "concurrency": int(os.getenv("GEMINI_CONCURRENCY", "6")),  # Max in-flight Gemini calls (6 = every chunk at once)
+    # Documents shorter than this are extracted with marshaled requests covering several
+    # chunks each; chunks missing from a response fall back to their own request
+    "marshal_chunks": os.getenv("GEMINI_MARSHAL_CHUNKS", "1") == "1",
+    "marshal_max_chars": 200000,
+    # Chunks are batched only while their estimated output fits this many tokens (headroom
+    # under max_output_tokens), so a batched response does not stop at MAX_TOKENS
+    "marshal_max_output_tokens": 28000,
+    # Successful chunk responses are cached on disk keyed by a hash of the full prompt
+    "disable_cache": os.getenv("GEMINI_DISABLE_CACHE") == "1",
+    "cache_dir": "extraction_output/cache",
+    # Constrain output to the field keys each prompt lists (GEMINI_RESPONSE_SCHEMA=0 to disable)
+    "response_schema": os.getenv("GEMINI_RESPONSE_SCHEMA", "1") == "1",
+    # Documents at least this long that need several per-chunk requests are uploaded once as
+    # Gemini cached context; each request then sends only its instructions
+    "context_cache": os.getenv("GEMINI_CONTEXT_CACHE", "1") == "1",
+    "context_cache_min_chars": 100000,
+    "context_cache_ttl_seconds": 600,
 }
 
-_rate_tracker: Dict[str, Any] = {"requests": [], "last_reset": time.time()}
+# Built once: BRSR filings legitimately mention accidents, harassment cases, etc.
+GEMINI_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+} if HarmCategory is not None else None
 
+_GENAI_MODEL = None
 
-async def wait_for_rate_limit():
-    now = time.time()
-    if now - _rate_tracker["last_reset"] > 60:
-        _rate_tracker["requests"] = []
-        _rate_tracker["last_reset"] = now
-    if len(_rate_tracker["requests"]) >= GEMINI_CONFIG["requests_per_minute"]:
-        await asyncio.sleep(60 - (now - _rate_tracker["last_reset"]))
-        _rate_tracker["requests"] = []
-        _rate_tracker["last_reset"] = time.time()
-    _rate_tracker["requests"].append(now)
 
+def _get_model():
+    """Return the shared GenerativeModel, constructing it on first use."""
+    global _GENAI_MODEL
+    if _GENAI_MODEL is None:
+        _GENAI_MODEL = genai.GenerativeModel(GEMINI_CONFIG["model"])
+    return _GENAI_MODEL
 
-def repair_json(text: str) -> str:
-    """Clean and extract JSON from response text.
-    
-    Handles:
-    - Markdown code blocks (```json ... ``` or ```...```)
-    - Leading/trailing whitespace
-    - Text before/after JSON
-    - Unterminated strings
-    - Missing closing brackets
+
+# Caps in-flight Gemini calls across all concurrently gathered chunks/requests
+_gemini_sem = asyncio.Semaphore(GEMINI_CONFIG["concurrency"])
+
+# Output directories (and resultIds) are the request timestamp plus a random suffix
+# (YYYYmmdd_HHMMSS_<8 hex>), so two requests in the same second never share one
+_RESULT_ID_RE = re.compile(r"\d{8}_\d{6}_[0-9a-f]{8}")
+
+# BRSR_DEBUG=1 keeps human-readable (indented) output files, writes the per-chunk and
+# merged-output debug files, and turns on DEBUG logging (including the raw response dumps
+# under extraction_output/debug); default is INFO
+BRSR_DEBUG = os.getenv("BRSR_DEBUG") == "1"
+
+logging.basicConfig(format="%(message)s")
+
+# All backend progress (extraction, Gemini calls, merge) goes through this one logger. It is
+# buffered and written to stdout in one go when the request finishes; a WARNING or above
+# flushes the buffer immediately
+_request_log_handler = logging.handlers.MemoryHandler(
+    capacity=256,
+    flushLevel=logging.WARNING,
+    target=logging.StreamHandler(sys.stdout),
+)
+_request_log_handler.target.setFormatter(logging.Formatter("%(message)s"))
+request_logger = logging.getLogger(f"{__name__}.request")
+request_logger.setLevel(logging.DEBUG if BRSR_DEBUG else logging.INFO)
+request_logger.addHandler(_request_log_handler)
+request_logger.propagate = False
+
+# Field names used when merging manual (frontend) inputs over AI-extracted data
+PRINCIPLES = ("p1", "p2", "p3", "p4", "p5", "p6", "p7", "p8", "p9")
+SECTION_A_CONTACT_FIELDS = ("contactName", "contactDesignation", "contactPhone", "contactEmail", "reportingBoundary")
+SIMPLE_TEXT_FIELDS_B = (
+    "valueChainExtension",
+    "certifications",
+    "commitments",
+    "performance",
+    "directorStatement",
+    "sustainabilityCommittee",
+)
+HEADCOUNT_GROUPS = ("permanent", "otherThanPermanent")
+HIGHEST_AUTHORITY_FIELDS = ("name", "designation", "din", "email", "phone")
+NOPOLICY_SUBKEYS = ("notMaterial", "notReady", "noResources", "plannedNextYear", "otherReason")
+
+# Principle keys (p1..p9) accepted in Section B manual per-principle inputs
+_PRINCIPLE_KEYS = frozenset(PRINCIPLES)
+
+# Policy Matrix row used for principles the user left out of the manual form
+_DEFAULT_POLICY_ROW = {"hasPolicy": "N", "approvedByBoard": "N", "translatedToProcedures": "N", "webLink": ""}
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; `acquire()`
+    waits only as long as needed for the next token, so callers are paced smoothly
+    instead of stalling for a whole minute when a fixed window fills up.
     """
-    text = text.strip()
-    
-    # Remove markdown code blocks more aggressively
-    if "```" in text:
-        # Remove all ``` markers
-        text = text.replace("```json", "").replace("```", "").strip()
-    
-    # Remove any remaining language markers at the start
-    lines = text.split('\n')
-    if lines and lines[0].strip().lower() in ['json', 'js', 'javascript']:
-        text = '\n'.join(lines[1:]).strip()
-    
-    # Try to find JSON array first (for key-value format)
-    array_start = text.find("[")
-    obj_start = text.find("{")
-    
-    # Determine if we have an array or object based on which comes first
-    if array_start != -1 and (obj_start == -1 or array_start < obj_start):
-        # This is an array - find its end
-        array_end = text.rfind("]")
-        if array_end != -1 and array_end > array_start:
-            json_text = text[array_start:array_end+1]
-            # Fix common JSON errors
-            json_text = fix_json_errors(json_text)
-            return json_text
-    
-    # Fall back to JSON object
-    if obj_start != -1:
-        obj_end = text.rfind("}")
-        if obj_end != -1 and obj_end > obj_start:
-            json_text = text[obj_start:obj_end+1]
-            json_text = fix_json_errors(json_text)
-            return json_text
-    
-    return text
 
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+# Shared by every Gemini caller: requests_per_minute spread evenly over the minute
+_gemini_bucket = TokenBucket(
+    rate=GEMINI_CONFIG["requests_per_minute"] / 60,
+    capacity=GEMINI_CONFIG["requests_per_minute"],
+)
 
-def fix_json_errors(json_text: str) -> str:
-    """Fix common JSON syntax errors like unterminated strings, trailing commas, unexpected characters, etc."""
-    # Remove unexpected unicode characters and control characters
-    import re
-    # Remove non-ASCII characters that aren't part of valid JSON
-    json_text = re.sub(r'[^\x00-\x7F\u0080-\uFFFF]+', '', json_text)
-    # Remove specific problematic patterns like "자를"
-    json_text = json_text.replace('자를', '').replace('\\uc790\\ub97c', '')
-    
-    # Fix unterminated strings at the end of lines
-    # Pattern: "value at end of line without closing quote
-    lines = json_text.split('\n')
-    fixed_lines = []
-    
-    for i, line in enumerate(lines):
-        # Check if line has unterminated string (odd number of quotes after the colon)
-        if '": "' in line or '":\\"' in line:
-            # Count quotes after the last ": " or ":\\"
-            if '": "' in line:
-                parts = line.split('": "', 1)
-            elif '":\\"' in line:
-                parts = line.split('":\\"', 1)
-            else:
-                fixed_lines.append(line)
-                continue
-                
-            if len(parts) == 2:
-                value_part = parts[1]
-                # Count unescaped quotes
-                quote_count = 0
-                escaped = False
-                for char in value_part:
-                    if char == '\\' and not escaped:
-                        escaped = True
-                        continue
-                    if char == '"' and not escaped:
-                        quote_count += 1
-                    escaped = False
-                
-                # If odd number of quotes, add closing quote before comma or end
-                if quote_count % 2 == 0:  # Even means unterminated (we expect odd: opening + closing)
-                    # Add closing quote before comma or at end
-                    if ',' in value_part:
-                        value_part = value_part.replace(',', '",', 1)
-                    elif not value_part.rstrip().endswith('"'):
-                        value_part = value_part.rstrip() + '"'
-                    line = parts[0] + '": "' + value_part
-        
-        fixed_lines.append(line)
-    
-    json_text = '\n'.join(fixed_lines)
-    
-    # Remove trailing commas before closing brackets
-    json_text = re.sub(r',(\s*[\]}])', r'\1', json_text)
-    
-    # Fix incomplete last object in array - if ends with { without closing }
-    if json_text.count('{') > json_text.count('}'):
-        json_text = json_text.rstrip()
-        if not json_text.endswith('}'):
-            json_text += '}'
+
+# Patterns used to pull JSON out of model responses (compiled once at import)
+_RE_CODE_FENCE = re.compile(r"```(?:json)?")
+
+
+def repair_json(text: str) -> Any:
+    """Parse the JSON payload out of a Gemini response, repairing it if needed.
     
-    return json_text
+    Strips markdown code fences, then tries a strict C-level parse (orjson when
+    installed). Only if that fails does the lenient `json_repair` parser recover
+    unterminated strings, trailing commas, missing brackets and surrounding prose.
+    Returns the parsed object; raises json.JSONDecodeError if nothing usable is found.
+    """
+    stripped = _RE_CODE_FENCE.sub("", text).strip()
+    try:
+        return _json_loads(stripped)
+    except json.JSONDecodeError:
+        if json_repair is None:
+            raise
+    result = json_repair.loads(stripped)
+    if not isinstance(result, (list, dict)):
+        raise json.JSONDecodeError("No JSON array/object found in response", stripped, 0)
+    return result
+
+
+# Long-lived directories (cache, debug) already created by this process
+_MADE_DIRS = set()
+
+
+def _ensure_dir(path: str) -> None:
+    """os.makedirs(path, exist_ok=True), skipped once this process has created `path`."""
+    if path not in _MADE_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _MADE_DIRS.add(path)
+
+
+def _cache_path(chunk_id: str, text_hash: str) -> str:
+    return os.path.join(GEMINI_CONFIG["cache_dir"], f"{chunk_id}_{text_hash[:16]}.json")
+
+
+def _read_cache(path: str) -> Optional[Dict[str, Any]]:
+    """Return a cached chunk result, or None if missing/unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path: str, result: Dict[str, Any]) -> None:
+    """Write a chunk result to the cache atomically (tmp file + os.replace)."""
+    try:
+        _ensure_dir(os.path.dirname(path))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_bytes(result))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        request_logger.warning(f"[Cache] Could not write {path}: {e}")
+
+
+def _retry_delay_seconds(error: Exception, default: float) -> float:
+    """Return the retry delay Gemini advertises on a 429 (RetryInfo detail), else `default`."""
+    delay = getattr(error, "retry_delay", None)
+    if delay is None:
+        for detail in getattr(error, "details", None) or ():
+            delay = getattr(detail, "retry_delay", None)
+            if delay is not None:
+                break
+    if delay is None:
+        return default
+    if isinstance(delay, (int, float)):
+        return float(delay)
+    if isinstance(delay, timedelta):
+        return delay.total_seconds()
+    return delay.seconds + delay.nanos / 1e9  # protobuf Duration
+
+
+def _stopped_at_max_tokens(response: Any) -> bool:
+    """True if Gemini cut the response off at max_output_tokens (finish_reason MAX_TOKENS)."""
+    candidates = getattr(response, "candidates", None)
+    if not candidates:
+        return False
+    reason = getattr(candidates[0], "finish_reason", None)
+    return getattr(reason, "name", reason) in ("MAX_TOKENS", 2)
+
+
+def _dump_json(path: str, obj: Any) -> None:
+    """Write `obj` as indented JSON (run in the default executor, off the event loop)."""
+    _write_bytes(path, _json_bytes(obj, indent=True))
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write pre-serialized `data` to `path` through a raw fd: one write() for the whole payload."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:  # os.write may be partial on some filesystems
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+async def _dump_json_batch(pending: List[tuple]) -> None:
+    """Write every `(path, obj)` in `pending` concurrently on the default executor."""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*[loop.run_in_executor(None, _dump_json, path, obj) for path, obj in pending])
+
+
+def _write_debug(path: str, payload: str) -> None:
+    """Write a debug dump (called via `asyncio.to_thread`, only when DEBUG logging is on)."""
+    _ensure_dir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
 
 
 def fill_nil_defaults(obj: Any) -> Any:
@@ -229,24 +384,175 @@ def fill_nil_defaults(obj: Any) -> Any:
     - Empty strings ("" or whitespace-only) -> "NIL"
     - None -> "NIL"
     - Lists and dicts are traversed recursively; empty lists are left as-is but their elements are processed.
+    
+    Lists and dicts are updated in place (manual payloads are freshly parsed and unshared),
+    so the tree is not rebuilt; the same object is returned.
     """
     if obj is None:
         return "NIL"
     if isinstance(obj, str):
         return obj if obj.strip() != "" else "NIL"
     if isinstance(obj, list):
-        return [fill_nil_defaults(x) for x in obj]
+        obj[:] = [fill_nil_defaults(x) for x in obj]
+        return obj
     if isinstance(obj, dict):
-        out = {}
         for k, v in obj.items():
-            out[k] = fill_nil_defaults(v)
-        return out
+            obj[k] = fill_nil_defaults(v)
+        return obj
     return obj
 
 
+# sha256(document) -> Future[int] of Gemini's token count, shared by concurrent chunk calls
+_token_counts: Dict[str, "asyncio.Future[int]"] = {}
+
+
+async def truncate_to_token_budget(text: str) -> str:
+    """Trim `text` so it fits within max_input_tokens minus prompt_token_reserve.
+    
+    Gemini tokens span at least one character, so text no longer (in characters) than
+    the budget is returned untouched without any API call. Longer text is measured once
+    with the model's count_tokens and cut proportionally.
+    """
+    budget = GEMINI_CONFIG["max_input_tokens"] - GEMINI_CONFIG["prompt_token_reserve"]
+    if len(text) <= budget:
+        return text
+    
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    future = _token_counts.get(key)
+    if future is None:
+        if len(_token_counts) >= 32:
+            _token_counts.clear()
+        future = _token_counts[key] = asyncio.ensure_future(asyncio.to_thread(lambda: _get_model().count_tokens(text).total_tokens))
+    try:
+        total_tokens = await asyncio.shield(future)
+    except Exception as e:
+        _token_counts.pop(key, None)
+        request_logger.warning(f"[Tokens] count_tokens failed ({e}); falling back to ~4 chars per token")
+        return text[:budget * 4]
+    
+    if total_tokens <= budget:
+        return text
+    request_logger.warning(f"[Tokens] Document is {total_tokens} tokens; truncating to {budget}")
+    return text[:int(len(text) * budget / total_tokens)]
+
+
+async def create_document_cache(text: str):
+    """Upload the (token-truncated) document once as Gemini cached context.
+    
+    Returns None when context caching is disabled, the document is shorter than
+    context_cache_min_chars, or the cache cannot be created (e.g. below the model's
+    minimum cacheable size); callers then send the document inline with every prompt.
+    """
+    if not GEMINI_CONFIG["context_cache"] or len(text) < GEMINI_CONFIG["context_cache_min_chars"]:
+        return None
+    if not GOOGLE_API_KEY or genai is None or not hasattr(genai, "caching"):
+        return None
+    truncated_text = await truncate_to_token_budget(text)
+    try:
+        cache = await asyncio.to_thread(
+            genai.caching.CachedContent.create,
+            model=GEMINI_CONFIG["model"],
+            contents=[{"role": "user", "parts": [truncated_text]}],
+            ttl=timedelta(seconds=GEMINI_CONFIG["context_cache_ttl_seconds"]),
+        )
+    except Exception as e:
+        request_logger.warning(f"[Context Cache] Could not cache document, sending it inline: {e}")
+        return None
+    request_logger.info(f"[Context Cache] Cached document as {cache.name}")
+    return cache
+
+
+def delete_document_cache(cache) -> None:
+    """Delete a cached document early instead of waiting for its TTL."""
+    try:
+        cache.delete()
+    except Exception as e:
+        request_logger.warning(f"[Context Cache] Could not delete {getattr(cache, 'name', cache)}: {e}")
+
+
+# Fixed parts of every extraction prompt:
+#   _PROMPT_PREAMBLE + manual context + "\n" + chunk["full_prefix"] + document text + suffix
+_PROMPT_PREAMBLE = """You are a BRSR (Business Responsibility and Sustainability Reporting) expert with advanced calculation capabilities.
+Extract data from this Indian company's annual report following SEBI BRSR Annexure 1 format.
+"""
+
+_DOCUMENT_HEADER = "\n\nDocument text:\n"
+
+_PROMPT_INSTRUCTIONS = """
+
+CRITICAL INSTRUCTIONS:
+1. Return ONLY valid JSON - no markdown code blocks, no explanations before or after
+2. Use the exact field names specified
+3. If data is not found, use empty string ""
+4. For numbers, use just the numeric value
+5. For percentages, include % symbol
+
+CALCULATION & PERCENTAGE INSTRUCTIONS (IMPORTANT):
+6. AUTOMATICALLY CALCULATE percentage fields when you have:
+   - Base values like Total Turnover, Total Revenue, Total Employees, Total Energy, Total Water, etc.
+   - Category/segment values (e.g., renewable energy, male employees, water consumed)
+   - Formula: (Category Value / Total Value) × 100
+   - Example: If Turnover = 185.6 INR Cr and Renewable Energy Spend = 50 INR Cr, calculate: (50/185.6)×100 = 26.94%
+
+7. DERIVE missing fields from available data:
+   - If you have FY and PY (Previous Year) values, calculate growth rates
+   - If you have absolute numbers and totals, calculate percentages
+   - If you have percentages and totals, calculate absolute values
+   - If you have intensity metrics components, calculate the ratio
+
+8. INTELLIGENT DATA EXTRACTION:
+   - Look for related data across different sections of the document
+   - Use footnotes, tables, and text to find base values (turnover, employee count, etc.)
+   - Cross-reference data to ensure calculations are accurate
+   - Round percentages to 2 decimal places
+
+9. Keep responses concise - no long paragraphs in values
+"""
+
+_PROMPT_EXAMPLES = """
+
+CALCULATION EXAMPLES:
+- Water intensity per turnover: (Total Water Withdrawal / Turnover) 
+- % Female Employees: (Female Count / Total Employees) × 100
+- % Board Independence: (Independent Directors / Total Directors) × 100
+- Energy intensity: (Total Energy / Production Output)"""
+
+_PROMPT_SUFFIX = _PROMPT_INSTRUCTIONS + """10. Return the COMPLETE object - do not truncate or stop mid-response
+11. Ensure the JSON object is properly closed with }
+12. Your response MUST start with { and end with }""" + _PROMPT_EXAMPLES
+
+_MARSHALED_PROMPT_SUFFIX = _PROMPT_INSTRUCTIONS + """10. Return the COMPLETE object - every section key with its complete inner object
+11. Ensure every inner object and the outer object are closed with }
+12. Your response MUST start with { and end with }""" + _PROMPT_EXAMPLES
+
+# Field keys enumerated in the agents.py prompts (sectiona_cin, sectionc_principle1_..., ...)
+_RE_FIELD_KEY = re.compile(r"\bsection[abc]_\w+")
+
+# Prompt prose that abbreviates keys instead of listing them ("_p1 through p9", "..._currentfy...",
+# "(and similar for ...)", "Extract ALL 96 fields"): the key set can't be read off the prompt
+_RE_KEY_SHORTHAND = re.compile(r"\bsection[abc]_\w+(?: through \w+|\.\.\.)|\(and similar\b|\bALL \d+ fields\b")
+
+
+def response_schema_for_prompt(prompt: str) -> Optional[Dict[str, Any]]:
+    """Build a Gemini response_schema: a flat object of the string fields the prompt lists.
+    
+    Constrained decoding can't emit keys outside the schema, so prompts that abbreviate any
+    keys get no schema (plain JSON mode) rather than one that silently drops fields.
+    """
+    if _RE_KEY_SHORTHAND.search(prompt):
+        return None
+    keys = dict.fromkeys(_RE_FIELD_KEY.findall(prompt))
+    if not keys:
+        return None
+    return {"type": "OBJECT", "properties": {k: {"type": "STRING"} for k in keys}}
+
+
+@lru_cache(maxsize=1)
 def get_extraction_chunks() -> List[Dict[str, Any]]:
     """Return chunk definitions whose prompts come from `agents.py`.
     
+    Built once per process and shared by every request, so callers must not mutate it.
+    
     Toggle chunks by commenting/uncommenting lines below.
     Currently: TESTING SECTIONS A, B, C P1-P2
     
@@ -266,19 +572,119 @@ def get_extraction_chunks() -> List[Dict[str, Any]]:
     # p7p8p9 = create_principles_7_8_9_agent()["prompt"]
 
     # TESTING MODE: Sections A, B, C P1-P2 enabled
-    return [
-        {"id": "sectionA_complete", "name": "Section A: Complete Company Information", "delay_seconds": 1, "prompt": secA},
-        {"id": "sectionB", "name": "Section B: Policies and Governance", "delay_seconds": 1, "prompt": secB},
-        {"id": "sectionC_p1_p2", "name": "Section C: Principles 1-2", "delay_seconds": 1, "prompt": p1p2},
-        # {"id": "sectionC_p3_p4", "name": "Section C: Principles 3-4", "delay_seconds": 1, "prompt": p3p4},
-        # {"id": "sectionC_p5_p6", "name": "Section C: Principles 5-6", "delay_seconds": 1, "prompt": p5p6},
-        # {"id": "sectionC_p7_p8_p9", "name": "Section C: Principles 7-9", "delay_seconds": 1, "prompt": p7p8p9},
+    chunks = [
+        {"id": "sectionA_complete", "name": "Section A: Complete Company Information", "prompt": secA},
+        {"id": "sectionB", "name": "Section B: Policies and Governance", "prompt": secB},
+        {"id": "sectionC_p1_p2", "name": "Section C: Principles 1-2", "prompt": p1p2},
+        # {"id": "sectionC_p3_p4", "name": "Section C: Principles 3-4", "prompt": p3p4},
+        # {"id": "sectionC_p5_p6", "name": "Section C: Principles 5-6", "prompt": p5p6},
+        # {"id": "sectionC_p7_p8_p9", "name": "Section C: Principles 7-9", "prompt": p7p8p9},
     ]
+    for ch in chunks:
+        ch["full_prefix"] = ch["prompt"] + _DOCUMENT_HEADER
+        ch["response_schema"] = response_schema_for_prompt(ch["prompt"])
+    # Resolve the nested paths of every flat key the prompts name, once (including prompts
+    # that get no response_schema because they abbreviate some keys)
+    precompute_paths(k for ch in chunks for k in _RE_FIELD_KEY.findall(ch["prompt"]))
+    return chunks
+
+
+# Rough output cost of one flat key in a response: key name plus a typical value; `_array`
+# keys hold a JSON-encoded table of rows
+_OUTPUT_TOKENS_PER_KEY = 120
+_OUTPUT_TOKENS_PER_ARRAY_KEY = 1500
+
+
+def estimate_output_tokens(chunk: Dict[str, Any]) -> int:
+    """Estimate how many output tokens `chunk`'s response takes, from the keys its prompt lists."""
+    keys = dict.fromkeys(_RE_FIELD_KEY.findall(chunk["prompt"]))
+    arrays = sum(1 for k in keys if k.endswith("_array"))
+    return (len(keys) - arrays) * _OUTPUT_TOKENS_PER_KEY + arrays * _OUTPUT_TOKENS_PER_ARRAY_KEY
+
+
+def get_marshal_batches(chunks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group consecutive chunks into batches whose estimated output fits marshal_max_output_tokens.
+    
+    A chunk that does not fit in the current batch starts a new one; single-chunk batches
+    are extracted with their own (non-marshaled) request.
+    """
+    budget = GEMINI_CONFIG["marshal_max_output_tokens"]
+    batches, batch, used = [], [], 0
+    for chunk in chunks:
+        cost = estimate_output_tokens(chunk)
+        if batch and used + cost > budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(chunk)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def get_marshaled_chunk(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the chunk config for one marshaled request covering `chunks`."""
+    marshaled_chunk = {
+        "id": "marshaled_" + "_".join(c["id"] for c in chunks),
+        "name": f"{len(chunks)} sections (single request)",
+        "prompt": get_marshaled_prompt(chunks),
+        "members": [c["id"] for c in chunks],
+    }
+    marshaled_chunk["full_prefix"] = marshaled_chunk["prompt"] + _DOCUMENT_HEADER
+    if all(c.get("response_schema") for c in chunks):
+        marshaled_chunk["response_schema"] = {
+            "type": "OBJECT",
+            "properties": {c["id"]: c["response_schema"] for c in chunks},
+        }
+    return marshaled_chunk
+
+
+def get_marshaled_prompt(chunks: List[Dict[str, Any]]) -> str:
+    """Combine several chunk prompts into one prompt answered by a single JSON object.
+    
+    Each chunk's prompt is placed under a `## <CHUNK ID>:` header and the model is asked
+    to return `{"<chunk id>": {"<field key>": "<value>", ...}, ...}`, one entry per chunk.
+    """
+    ids = [c["id"] for c in chunks]
+    example = ", ".join(f'"{cid}": {{...}}' for cid in ids)
+    sections = "\n\n".join(f"## {c['id'].upper()}:\n{c['prompt']}" for c in chunks)
+    return (
+        f"This request covers {len(chunks)} extraction sections. Follow each section's field list and rules below.\n"
+        f"Return ONE JSON object whose keys are the section ids ({', '.join(ids)}) and whose values are "
+        f"the flat JSON objects of field keys and values requested in that section: {{{example}}}\n\n"
+        f"{sections}"
+    )
+
+
+def _extract_text_with_pdfium(file_content: bytes) -> str:
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_content)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                parts.append("\n")
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return "".join(parts)
 
 
 def extract_text_from_pdf(file_content: bytes) -> str:
+    # Native PDFium text extraction is much faster than pdfplumber/pdfminer; keep
+    # pdfplumber as the fallback when pypdfium2 is not installed or cannot read the file.
+    if pdfium is not None:
+        try:
+            return _extract_text_with_pdfium(file_content)
+        except Exception as e:
+            if not pdfplumber:
+                raise HTTPException(status_code=400, detail=f"Could not read PDF: {e}")
+            request_logger.warning(f"[PDF] pypdfium2 failed ({e}); falling back to pdfplumber")
+
     if not pdfplumber:
-        raise HTTPException(status_code=500, detail="pdfplumber not installed")
+        raise HTTPException(status_code=500, detail="Neither pypdfium2 nor pdfplumber is installed")
     
     # Suppress ALL PDF parsing warnings (malformed PDFs generate noise but don't affect text extraction)
     import warnings
@@ -297,22 +703,28 @@ def extract_text_from_pdf(file_content: bytes) -> str:
 def extract_text_from_excel(file_content: bytes) -> str:
     if not openpyxl:
         raise HTTPException(status_code=500, detail="openpyxl not installed")
-    workbook = openpyxl.load_workbook(io.BytesIO(file_content))
-    text = ""
-    print(f"[Excel] Found {len(workbook.worksheets)} sheets: {[sheet.title for sheet in workbook.worksheets]}")
+    # read_only streams rows instead of building every cell object; data_only
+    # returns cached formula results rather than formula strings
+    workbook = openpyxl.load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    parts = []
+    request_logger.info(f"[Excel] Found {len(workbook.worksheets)} sheets: {[sheet.title for sheet in workbook.worksheets]}")
     
     for sheet in workbook.worksheets:
         # Add sheet name as header for context
-        text += f"\n\n=== SHEET: {sheet.title} ===\n\n"
+        parts.append(f"\n\n=== SHEET: {sheet.title} ===\n\n")
         row_count = 0
         for row in sheet.iter_rows(values_only=True):
-            row_text = " | ".join([str(cell) if cell is not None else "" for cell in row])
-            if row_text.strip():
-                text += row_text + "\n"
-                row_count += 1
-        print(f"[Excel] Sheet '{sheet.title}': extracted {row_count} rows")
+            # Skip empty rows before building any strings for them
+            if not any(cell is not None and cell != "" for cell in row):
+                continue
+            parts.append(" | ".join("" if cell is None else str(cell) for cell in row))
+            parts.append("\n")
+            row_count += 1
+        request_logger.info(f"[Excel] Sheet '{sheet.title}': extracted {row_count} rows")
+    workbook.close()
     
-    print(f"[Excel] Total text length: {len(text)} characters")
+    text = "".join(parts)
+    request_logger.info(f"[Excel] Total text length: {len(text)} characters")
     return text
 
 
@@ -333,52 +745,66 @@ if __name__ == '__main__':
     pass
 
 
-async def extract_chunk_with_gemini(text: str, chunk: Dict[str, Any], manual_data: Dict[str, Any] = None, manual_data_b: Dict[str, Any] = None, manual_data_cp1: Dict[str, Any] = None, manual_data_cp2: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Extract data using Gemini API with rate limiting, retry logic, and JSON repair.
+# Gemini's materialIssues field names -> frontend field names
+_MAT_RENAME = {
+    "materialIssue": "issue",
+    "riskOpportunity": "type",
+    "approachToMitigate": "approach",
+    "financialImplication": "financialImplications",
+}
+
+
+def _maybe_parse(value: Any) -> Any:
+    """Parse a JSON-encoded array/object string (surrounding whitespace and markdown code
+    fences allowed); return anything else, or a string that fails to parse, unchanged."""
+    if not isinstance(value, str):
+        return value
+    stripped = value.strip()
+    if stripped[:1] == "`":
+        stripped = _RE_CODE_FENCE.sub("", stripped).strip()
+    if stripped[:1] in ("[", "{"):
+        try:
+            return _json_loads(stripped)
+        except json.JSONDecodeError:
+            return value
+    return value
+
+
+def normalize_flat_output(output: Any) -> Dict[str, Any]:
+    """Normalize one chunk's parsed Gemini output into the flat dict used by the merge.
     
-    Args:
-        text: PDF text to extract from
-        chunk: Extraction chunk configuration
-        manual_data: Optional manual Section A data from frontend that AI can validate/correct
-        manual_data_b: Optional manual Section B data (Policy Matrix + policyWebLink) that AI can use as context
+    Gemini returns `{"<field key>": <value>, ...}`; the older `[{"key": ..., "value": ...}]`
+    format is still accepted. JSON-string values of `_array` keys are parsed, and
+    materialIssues entries are renamed to the frontend field names.
     """
+    if isinstance(output, list):
+        output = {item["key"]: item["value"] for item in output if isinstance(item, dict) and "key" in item and "value" in item}
+    elif not isinstance(output, dict):
+        return {}
+    flat_dict = {key: _maybe_parse(value) if key.endswith("_array") else value for key, value in output.items()}
     
-    # SPECIAL HANDLING: For Section C chunks (any chunk id containing 'sectionC_p1_p2'),
-    # if manual data exists for principle 1 or principle 2, skip AI extraction and return the
-    # user-provided data directly (AI is used only when manual inputs are absent).
-    if 'sectionC_p1_p2' in chunk.get('id', ''):
-        result = {}
-        if manual_data_cp1:
-            print(f"[Section C P1] Using manual data directly (skipping PDF extraction)")
-            result["principle1"] = manual_data_cp1
-        if manual_data_cp2:
-            print(f"[Section C P2] Using manual data directly (skipping PDF extraction)")
-            result["principle2"] = manual_data_cp2
-        if manual_data_cp1 or manual_data_cp2:
-            print(f"[Section C] Returning user-provided data without AI extraction")
-            return result
-    
-    if not GOOGLE_API_KEY or not genai:
-        raise HTTPException(status_code=500, detail="Gemini API not configured. Set GOOGLE_API_KEY.")
-    
-    model = genai.GenerativeModel(GEMINI_CONFIG["model"])
-    
-    # Wait for rate limit
-    await wait_for_rate_limit()
-    
-    # Truncate text to max tokens (approximate)
-    max_chars = GEMINI_CONFIG["max_input_tokens"] * 4  # ~4 chars per token
-    truncated_text = text[:max_chars]
+    # Fix field names in materialIssues array to match frontend structure
+    material_issues = flat_dict.get("sectiona_materialIssues_array")
+    if isinstance(material_issues, list):
+        flat_dict["sectiona_materialIssues_array"] = [
+            {_MAT_RENAME.get(k, k): v for k, v in issue.items()} if isinstance(issue, dict) else issue
+            for issue in material_issues
+        ]
     
+    return flat_dict
+
+
+def build_manual_context(chunk_id: str, manual_data: Dict[str, Any] = None, manual_data_b: Dict[str, Any] = None) -> str:
+    """Return the prompt block describing user-provided manual data relevant to `chunk_id`."""
     # Build context about manual Section A data if provided
     manual_data_context = ""
-    if manual_data and chunk['id'] in ['sectionA_complete', 'sectionA_part1']:
+    if manual_data and chunk_id in ['sectionA_complete', 'sectionA_part1']:
         manual_data_context = f"""
 
 USER PROVIDED MANUAL DATA (Section A - ALWAYS USE THIS):
 The user has manually entered the following Section A data via frontend form.
 This data is AUTHORITATIVE and you MUST NOT override it.
-{json.dumps(manual_data, indent=2)}
+{_json_bytes(manual_data, indent=True).decode()}
 
 CONTEXT USAGE INSTRUCTIONS:
 - DO NOT extract/override these fields from PDF - user data is final
@@ -396,7 +822,7 @@ Example usage:
 """
     
     # Build context about manual Section B data if provided
-    if manual_data_b and chunk.get('id') == 'sectionB':
+    if manual_data_b and chunk_id == 'sectionB':
         policy_matrix_summary = ""
         if manual_data_b.get("policyMatrix"):
             policy_matrix_summary = "\nPolicy Matrix provided by user:\n"
@@ -452,241 +878,184 @@ CONTEXT USAGE INSTRUCTIONS FOR SECTION B:
    - If contradictions exist between user input and PDF, TRUST USER for Policy Matrix, EXTRACT from PDF for Q3-Q12
 """
     
+    return manual_data_context
+
+
+async def _chunk_prompt(text: str, chunk: Dict[str, Any], manual_data: Dict[str, Any] = None, manual_data_b: Dict[str, Any] = None):
+    """Build `chunk`'s full (inline-document) prompt.
+    
+    Returns (prompt, manual_data_context, suffix, cache_path); cache_path is the response
+    cache file keyed by the prompt, or None when the response cache is disabled.
+    """
+    # Truncate text to the input token budget (counted by Gemini, once per document)
+    truncated_text = await truncate_to_token_budget(text)
+    
+    # Context about manual Section A/B data (for a marshaled request: every member chunk)
+    manual_data_context = "".join(
+        build_manual_context(cid, manual_data, manual_data_b) for cid in chunk.get("members", [chunk["id"]])
+    )
+    
     # Section C manual contexts removed (P1/P2 not accepted via API anymore)
     
-    # Use the original chunk prompt by default
-    chunk_prompt = chunk['prompt']
+    # Static preamble/suffix are module constants; the chunk's prompt + document header is
+    # precomputed in get_extraction_chunks, so only the document text is spliced in per call
+    suffix = _MARSHALED_PROMPT_SUFFIX if chunk.get("members") else _PROMPT_SUFFIX
+    prompt = "".join((_PROMPT_PREAMBLE, manual_data_context, "\n", chunk["full_prefix"], truncated_text, suffix))
     
-    # Updated prompt as per updates section
-    prompt = f"""You are a BRSR (Business Responsibility and Sustainability Reporting) expert with advanced calculation capabilities.
-Extract data from this Indian company's annual report following SEBI BRSR Annexure 1 format.
-{manual_data_context}
-{chunk_prompt}
+    cache_path = None
+    if not GEMINI_CONFIG["disable_cache"]:
+        prompt_hash = hashlib.sha256(f"{GEMINI_CONFIG['model']}\n{prompt}".encode("utf-8")).hexdigest()
+        cache_path = _cache_path(chunk["id"], prompt_hash)
+    return prompt, manual_data_context, suffix, cache_path
 
-Document text:
-{truncated_text}
-
-CRITICAL INSTRUCTIONS:
-1. Return ONLY valid JSON - no markdown code blocks, no explanations before or after
-2. Use the exact field names specified
-3. If data is not found, use empty string ""
-4. For numbers, use just the numeric value
-5. For percentages, include % symbol
 
-CALCULATION & PERCENTAGE INSTRUCTIONS (IMPORTANT):
-6. AUTOMATICALLY CALCULATE percentage fields when you have:
-   - Base values like Total Turnover, Total Revenue, Total Employees, Total Energy, Total Water, etc.
-   - Category/segment values (e.g., renewable energy, male employees, water consumed)
-   - Formula: (Category Value / Total Value) × 100
-   - Example: If Turnover = 185.6 INR Cr and Renewable Energy Spend = 50 INR Cr, calculate: (50/185.6)×100 = 26.94%
-
-7. DERIVE missing fields from available data:
-   - If you have FY and PY (Previous Year) values, calculate growth rates
-   - If you have absolute numbers and totals, calculate percentages
-   - If you have percentages and totals, calculate absolute values
-   - If you have intensity metrics components, calculate the ratio
-
-8. INTELLIGENT DATA EXTRACTION:
-   - Look for related data across different sections of the document
-   - Use footnotes, tables, and text to find base values (turnover, employee count, etc.)
-   - Cross-reference data to ensure calculations are accurate
-   - Round percentages to 2 decimal places
+async def cached_chunk_response(text: str, chunk: Dict[str, Any], manual_data: Dict[str, Any] = None, manual_data_b: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """Return the cached response for `chunk`, or None on a miss or with the cache disabled."""
+    if GEMINI_CONFIG["disable_cache"]:
+        return None
+    _, _, _, cache_path = await _chunk_prompt(text, chunk, manual_data, manual_data_b)
+    return _read_cache(cache_path)
 
-9. Keep responses concise - no long paragraphs in values
-10. Return the COMPLETE array - do not truncate or stop mid-response
-11. Ensure the JSON array is properly closed with ]
-12. Your response MUST start with [ and end with ]
 
-CALCULATION EXAMPLES:
-- Water intensity per turnover: (Total Water Withdrawal / Turnover) 
-- % Female Employees: (Female Count / Total Employees) × 100
-- % Board Independence: (Independent Directors / Total Directors) × 100
-- Energy intensity: (Total Energy / Production Output)"""
+async def extract_chunk_with_gemini(text: str, chunk: Dict[str, Any], manual_data: Dict[str, Any] = None, manual_data_b: Dict[str, Any] = None, manual_data_cp1: Dict[str, Any] = None, manual_data_cp2: Dict[str, Any] = None, doc_cache=None) -> Dict[str, Any]:
+    """Extract data using Gemini API with rate limiting, retry logic, and JSON repair.
+    
+    Args:
+        text: PDF text to extract from
+        chunk: Extraction chunk configuration
+        manual_data: Optional manual Section A data from frontend that AI can validate/correct
+        manual_data_b: Optional manual Section B data (Policy Matrix + policyWebLink) that AI can use as context
+        doc_cache: Optional CachedContent holding `text` (see create_document_cache); the
+            document is then left out of the prompt
+    """
+    
+    # SPECIAL HANDLING: For Section C chunks (any chunk id containing 'sectionC_p1_p2'),
+    # if manual data exists for principle 1 or principle 2, skip AI extraction and return the
+    # user-provided data directly (AI is used only when manual inputs are absent).
+    if 'sectionC_p1_p2' in chunk.get('id', ''):
+        result = {}
+        if manual_data_cp1:
+            request_logger.info(f"[Section C P1] Using manual data directly (skipping PDF extraction)")
+            result["principle1"] = manual_data_cp1
+        if manual_data_cp2:
+            request_logger.info(f"[Section C P2] Using manual data directly (skipping PDF extraction)")
+            result["principle2"] = manual_data_cp2
+        if manual_data_cp1 or manual_data_cp2:
+            request_logger.info(f"[Section C] Returning user-provided data without AI extraction")
+            return result
     
+    if not GOOGLE_API_KEY or not genai:
+        raise HTTPException(status_code=500, detail="Gemini API not configured. Set GOOGLE_API_KEY.")
+    
+    if doc_cache is not None:
+        model = genai.GenerativeModel.from_cached_content(cached_content=doc_cache)
+    else:
+        model = _get_model()
+    
+    prompt, manual_data_context, suffix, cache_path = await _chunk_prompt(text, chunk, manual_data, manual_data_b)
+    # With cached context only the instructions are sent; `prompt` still keys the response cache
+    request_prompt = prompt if doc_cache is None else "".join((_PROMPT_PREAMBLE, manual_data_context, "\n", chunk["prompt"], suffix))
+    
+    # Re-running the same document (and manual inputs) reuses the earlier successful response
+    if cache_path:
+        cached = _read_cache(cache_path)
+        if cached:
+            request_logger.info(f"[Chunk: {chunk['id']}] Using cached response: {cache_path}")
+            return cached
+    
+    generation_config = {
+        "temperature": 0.1,
+        "max_output_tokens": GEMINI_CONFIG["max_output_tokens"],
+        # Constrained decoding: the response body is bare JSON (no fences/prose)
+        "response_mime_type": "application/json",
+    }
+    if GEMINI_CONFIG["response_schema"] and chunk.get("response_schema"):
+        generation_config["response_schema"] = chunk["response_schema"]
+    
+    rate_limit_backoff = GEMINI_CONFIG["retry_delay_base"]
     for attempt in range(GEMINI_CONFIG["max_retries"]):
         try:
-            print(f"[Chunk: {chunk['id']}] Attempt {attempt + 1}...")
+            request_logger.debug(f"[Chunk: {chunk['id']}] Attempt {attempt + 1}...")
             
-            response = await asyncio.to_thread(
-                model.generate_content,
-                prompt,
-                generation_config={
-                    "temperature": 0.1,
-                    "max_output_tokens": GEMINI_CONFIG["max_output_tokens"]
-                },
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                }
-            )
+            # Wait for rate limit; every attempt (retries included) is a request and spends a token
+            await _gemini_bucket.acquire()
+            async with _gemini_sem:
+                response = await asyncio.to_thread(
+                    model.generate_content,
+                    request_prompt,
+                    generation_config=generation_config,
+                    safety_settings=GEMINI_SAFETY_SETTINGS
+                )
             
             # Debug: Check if response exists and for safety blocks
             if not response:
-                print(f"[Chunk: {chunk['id']}] No response from Gemini")
+                request_logger.warning(f"[Chunk: {chunk['id']}] No response from Gemini")
                 raise ValueError("Empty response from Gemini")
             
             # Check for blocked responses
             if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
-                print(f"[Chunk: {chunk['id']}] Prompt feedback: {response.prompt_feedback}")
+                request_logger.warning(f"[Chunk: {chunk['id']}] Prompt feedback: {response.prompt_feedback}")
             
             if not hasattr(response, 'text') or not response.text:
-                print(f"[Chunk: {chunk['id']}] No text in response. Candidates: {response.candidates if hasattr(response, 'candidates') else 'N/A'}")
+                request_logger.warning(f"[Chunk: {chunk['id']}] No text in response. Candidates: {response.candidates if hasattr(response, 'candidates') else 'N/A'}")
                 if hasattr(response, 'candidates') and response.candidates:
-                    print(f"[Chunk: {chunk['id']}] First candidate: {response.candidates[0]}")
+                    request_logger.warning(f"[Chunk: {chunk['id']}] First candidate: {response.candidates[0]}")
                 raise ValueError("No text in Gemini response - possibly blocked by safety filters")
             
             response_text = response.text.strip()
-            print(f"[Chunk: {chunk['id']}] Response length: {len(response_text)} chars")
+            request_logger.info(f"[Chunk: {chunk['id']}] Response length: {len(response_text)} chars")
             
             # Save raw response to file for debugging
             debug_dir = "extraction_output/debug"
-            os.makedirs(debug_dir, exist_ok=True)
-            debug_file = os.path.join(debug_dir, f"{chunk['id']}_raw_response.txt")
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(response_text)
-            print(f"[Chunk: {chunk['id']}] Saved raw response to: {debug_file}")
+            if request_logger.isEnabledFor(logging.DEBUG):
+                debug_file = os.path.join(debug_dir, f"{chunk['id']}_raw_response.txt")
+                await asyncio.to_thread(_write_debug, debug_file, response_text)
+                request_logger.debug(f"[Chunk: {chunk['id']}] Saved raw response to: {debug_file}")
             
             # Debug: Print first 200 chars of response
             if response_text:
-                print(f"[Chunk: {chunk['id']}] Response preview: {response_text[:200]}...")
+                request_logger.debug(f"[Chunk: {chunk['id']}] Response preview: {response_text[:200]}...")
             else:
-                print(f"[Chunk: {chunk['id']}] WARNING: Empty response text")
+                request_logger.warning(f"[Chunk: {chunk['id']}] WARNING: Empty response text")
                 raise ValueError("Empty response text from Gemini")
             
             # Check if response looks incomplete
             if len(response_text) < 1000:
-                print(f"[Chunk: {chunk['id']}] WARNING: Response seems short/incomplete")
-            
-            repaired_json = repair_json(response_text)
-            print(f"[Chunk: {chunk['id']}] Repaired JSON length: {len(repaired_json)} chars")
-            print(f"[Chunk: {chunk['id']}] Repaired JSON starts with: {repaired_json[:50]}...")
-            print(f"[Chunk: {chunk['id']}] Repaired JSON ends with: ...{repaired_json[-50:]}")
+                request_logger.warning(f"[Chunk: {chunk['id']}] WARNING: Response seems short/incomplete")
             
-            # Save repaired JSON to file for debugging
-            repaired_file = os.path.join(debug_dir, f"{chunk['id']}_repaired_json.txt")
-            with open(repaired_file, 'w', encoding='utf-8') as f:
-                f.write(repaired_json)
-            print(f"[Chunk: {chunk['id']}] Saved repaired JSON to: {repaired_file}")
+            truncated = _stopped_at_max_tokens(response)
+            if truncated:
+                request_logger.warning(f"[Chunk: {chunk['id']}] Response stopped at max_output_tokens")
             
             try:
-                result = json.loads(repaired_json)
+                result = _json_loads(response_text)
+            except json.JSONDecodeError:
+                # Only output cut off at max_output_tokens should land here
+                request_logger.warning(f"[Chunk: {chunk['id']}] Response is not valid JSON, repairing...")
+                result = repair_json(response_text)
+            
+            if chunk.get("members"):
+                # Marshaled response: {"<chunk id>": {flat keys}, ...}
+                if not isinstance(result, dict):
+                    raise json.JSONDecodeError("Marshaled response is not a JSON object", response_text, 0)
+                if truncated:
+                    # The member being written when output stopped is only partially filled:
+                    # drop it so it goes back through its own per-chunk request
+                    last = next((cid for cid in reversed(result) if cid in chunk["members"]), None)
+                    if last is not None:
+                        request_logger.warning(f"[Chunk: {chunk['id']}] Dropping incomplete member {last}")
+                        result[last] = {}
+                result = {cid: normalize_flat_output(result.get(cid)) for cid in chunk["members"]}
+                request_logger.info(f"[Chunk: {chunk['id']}] Split marshaled response: " + ", ".join(f"{cid}={len(d)}" for cid, d in result.items()))
+            else:
+                result = normalize_flat_output(result)
+                request_logger.info(f"[Chunk: {chunk['id']}] Extracted {len(result)} flat keys")
                 
-                # Convert key-value array format to flat dictionary
-                if isinstance(result, list):
-                    print(f"[Chunk: {chunk['id']}] Converting key-value array to flat dict...")
-                    flat_dict = {}
-                    
-                    # Fields that should be parsed as JSON even without _array suffix
-                    json_fields = ["sectiona_materialIssues_array"]
-                    
-                    for item in result:
-                        if isinstance(item, dict) and "key" in item and "value" in item:
-                            key = item["key"]
-                            value = item["value"]
-                            
-                            # If value is a JSON string and key ends with _array OR is in json_fields, parse it
-                            if isinstance(value, str) and (key.endswith("_array") or key in json_fields):
-                                try:
-                                    # Try to parse JSON string to actual array/object
-                                    parsed_value = json.loads(value)
-                                    
-                                    # Fix field names in materialIssues array to match frontend structure
-                                    if key == "sectiona_materialIssues_array" and isinstance(parsed_value, list):
-                                        for issue in parsed_value:
-                                            if isinstance(issue, dict):
-                                                # Rename: materialIssue → issue, riskOpportunity → type
-                                                if "materialIssue" in issue:
-                                                    issue["issue"] = issue.pop("materialIssue")
-                                                if "riskOpportunity" in issue:
-                                                    issue["type"] = issue.pop("riskOpportunity")
-                                                if "approachToMitigate" in issue:
-                                                    issue["approach"] = issue.pop("approachToMitigate")
-                                                if "financialImplication" in issue:
-                                                    issue["financialImplications"] = issue.pop("financialImplication")
-                                    
-                                    flat_dict[key] = parsed_value
-                                except json.JSONDecodeError:
-                                    # If parsing fails, keep as string
-                                    flat_dict[key] = value
-                            else:
-                                flat_dict[key] = value
-                    
-                    result = flat_dict
-                    print(f"[Chunk: {chunk['id']}] Converted {len(flat_dict)} key-value pairs")
-                    
-                    # Save flat dict to file for debugging
+                # Save flat dict to file for debugging
+                if request_logger.isEnabledFor(logging.DEBUG):
                     flat_dict_file = os.path.join(debug_dir, f"{chunk['id']}_flat_dict.json")
-                    with open(flat_dict_file, 'w', encoding='utf-8') as f:
-                        json.dump(flat_dict, f, indent=2, ensure_ascii=False)
-                    print(f"[Chunk: {chunk['id']}] Saved flat dict to: {flat_dict_file}")
-                
-            except json.JSONDecodeError as inner_e:
-                print(f"[Chunk: {chunk['id']}] JSON parse error, trying fallback extraction...")
-                print(f"[Chunk: {chunk['id']}] Repaired JSON preview: {repaired_json[:300]}...")
-                
-                # Try to extract array or object - use a more robust pattern
-                # First try array (for key-value format)
-                array_match = re.search(r'\[[\s\S]*\]', repaired_json)
-                if array_match:
-                    try:
-                        result = json.loads(array_match.group())
-                        print(f"[Chunk: {chunk['id']}] Fallback: Extracted array with {len(result) if isinstance(result, list) else 'unknown'} items")
-                        
-                        # Convert key-value array to flat dict
-                        if isinstance(result, list):
-                            flat_dict = {}
-                            for item in result:
-                                if isinstance(item, dict) and "key" in item and "value" in item:
-                                    flat_dict[item["key"]] = item["value"]
-                            result = flat_dict
-                            print(f"[Chunk: {chunk['id']}] Fallback: Converted {len(flat_dict)} key-value pairs")
-                        else:
-                            print(f"[Chunk: {chunk['id']}] Fallback: Result is not a list, type: {type(result)}")
-                    except Exception as fallback_err:
-                        print(f"[Chunk: {chunk['id']}] Fallback array parsing failed: {fallback_err}")
-                        # If array parsing fails, manually extract all key-value pairs
-                        print(f"[Chunk: {chunk['id']}] Attempting manual key-value extraction...")
-                        flat_dict = {}
-                        # Find all {"key": "...", "value": "..."} patterns
-                        kv_pattern = r'\{\s*"key"\s*:\s*"([^"]+)"\s*,\s*"value"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}]+)\s*\}'
-                        matches = re.finditer(kv_pattern, repaired_json)
-                        count = 0
-                        for match in matches:
-                            key = match.group(1)
-                            value_str = match.group(2)
-                            # Parse the value (remove quotes if it's a string, or parse JSON if it's an object/array)
-                            try:
-                                # First json.loads removes outer quotes
-                                value = json.loads(value_str)
-                                # If result is still a string starting with [ or {, parse again (double-escaped JSON)
-                                if isinstance(value, str) and (value.startswith('[') or value.startswith('{')):
-                                    try:
-                                        value = json.loads(value)
-                                    except:
-                                        pass  # Keep as string if second parse fails
-                            except:
-                                value = value_str.strip('"')
-                            flat_dict[key] = value
-                            count += 1
-                        
-                        if flat_dict:
-                            result = flat_dict
-                            print(f"[Chunk: {chunk['id']}] Manual extraction: Found {count} key-value pairs")
-                        else:
-                            print(f"[Chunk: {chunk['id']}] Fallback: No key-value pairs found")
-                            raise inner_e
-                else:
-                    # Try object fallback
-                    print(f"[Chunk: {chunk['id']}] Fallback: No array found, trying object extraction...")
-                    obj_match = re.search(r'\{[^{}]*\}', repaired_json)
-                    if obj_match:
-                        result = json.loads(obj_match.group())
-                        print(f"[Chunk: {chunk['id']}] Fallback: Extracted single object")
-                    else:
-                        print(f"[Chunk: {chunk['id']}] Fallback: No valid JSON found in repaired text")
-                        raise inner_e
+                    await asyncio.to_thread(_write_debug, flat_dict_file, _json_bytes(result, indent=True).decode())
+                    request_logger.debug(f"[Chunk: {chunk['id']}] Saved flat dict to: {flat_dict_file}")
             
             # Original code for validation:
             # # Validate critical fields using guidance
@@ -695,32 +1064,37 @@ CALCULATION EXAMPLES:
             # Updated validation call
             validate_extracted_data(result, chunk['id'])
             
-            print(f"[Chunk: {chunk['id']}] Success!")
+            # Never cache cut-off output, or a marshaled response with no member data
+            has_data = any(result.values()) if chunk.get("members") else bool(result)
+            if cache_path and has_data and not truncated:
+                _write_cache(cache_path, result)
+            
+            request_logger.info(f"[Chunk: {chunk['id']}] Success!")
             return result
             
         except json.JSONDecodeError as e:
-            print(f"[Chunk: {chunk['id']}] JSON parse error (attempt {attempt + 1}): {e}")
+            request_logger.warning(f"[Chunk: {chunk['id']}] JSON parse error (attempt {attempt + 1}): {e}")
             if attempt < GEMINI_CONFIG["max_retries"] - 1:
                 # delay = GEMINI_CONFIG["retry_delay_base"] ** (attempt + 1) # Original
                 # Updated delay calculation
                 delay = GEMINI_CONFIG["retry_delay_base"] * (attempt + 1)
-                print(f"[Chunk: {chunk['id']}] Retrying in {delay}s...")
+                request_logger.warning(f"[Chunk: {chunk['id']}] Retrying in {delay}s...")
                 await asyncio.sleep(delay)
+        except ResourceExhausted as e:
+            # Rate limit hit - wait as long as the API says the quota needs, else back off exponentially
+            delay = _retry_delay_seconds(e, default=rate_limit_backoff)
+            rate_limit_backoff *= 2
+            request_logger.warning(f"[Chunk: {chunk['id']}] Rate limit hit (attempt {attempt + 1}). Waiting {delay:.1f}s...")
+            await asyncio.sleep(delay)
         except Exception as e:
-            error_str = str(e).lower() # Added for easier error checking
-            print(f"[Chunk: {chunk['id']}] Error (attempt {attempt + 1}): {e}")
-            if "429" in str(e) or "quota" in error_str or "rate" in error_str or "exceeded" in error_str: # Updated error checking
-                # Rate limit hit - wait full minute for free tier quota to reset
-                delay = 60  # Always wait 60s for rate limit (free tier resets every minute)
-                print(f"[Chunk: {chunk['id']}] Rate limit hit! Free tier is 5 requests/minute. Waiting {delay}s for quota reset...")
-                await asyncio.sleep(delay)
-            elif attempt < GEMINI_CONFIG["max_retries"] - 1:
+            request_logger.warning(f"[Chunk: {chunk['id']}] Error (attempt {attempt + 1}): {e}")
+            if attempt < GEMINI_CONFIG["max_retries"] - 1:
                 # delay = GEMINI_CONFIG["retry_delay_base"] ** (attempt + 1) # Original
                 # Updated delay calculation
                 delay = GEMINI_CONFIG["retry_delay_base"] * (attempt + 1)
                 await asyncio.sleep(delay)
     
-    print(f"[Chunk: {chunk['id']}] Failed after {GEMINI_CONFIG['max_retries']} attempts")
+    request_logger.error(f"[Chunk: {chunk['id']}] Failed after {GEMINI_CONFIG['max_retries']} attempts")
     return {}
 
 
@@ -738,34 +1112,28 @@ def merge_extracted_data(all_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
     # Start with empty result - will build nested structure from flat keys
     result = {}
     
+    # Validate shape once: only non-empty flat dicts (what normalize_flat_output yields) are
+    # merged, so the transform/merge loop below runs without a per-chunk try/except
+    chunks = []
     for chunk_id, flat_data in all_chunks:
         if not flat_data:
-            print(f"[Merge] Skipping empty chunk: {chunk_id}")
-            continue
-        
-        print(f"[Merge] Processing {chunk_id} with {len(flat_data)} flat keys")
+            request_logger.info(f"[Merge] Skipping empty chunk: {chunk_id}")
+        elif not isinstance(flat_data, dict):
+            request_logger.error(f"[Merge ERROR] Skipping chunk {chunk_id}: expected a flat dict, got {type(flat_data).__name__}")
+        else:
+            chunks.append((chunk_id, flat_data))
+    
+    for chunk_id, flat_data in chunks:
+        request_logger.info(f"[Merge] Processing {chunk_id} with {len(flat_data)} flat keys")
         
         # Transform flat keys to nested structure
-        try:
-            nested_chunk = transform_flat_to_nested(flat_data)
-            print(f"[Merge] Transformed to nested structure: {list(nested_chunk.keys())}")
-            
-            # Deep merge this chunk into result
-            result = merge_nested_data(result, nested_chunk)
-            
-        except Exception as e:
-            print(f"[Merge ERROR] Failed to transform chunk {chunk_id}: {str(e)}")
-            continue
-    
-    print(f"[Merge] Final structure sections: {list(result.keys())}")
+        nested_chunk = transform_flat_to_nested(flat_data)
+        request_logger.info(f"[Merge] Transformed to nested structure: {list(nested_chunk.keys())}")
+        
+        # Deep merge this chunk into result (the first chunk is taken as-is)
+        result = merge_nested_data(result, nested_chunk) if result else nested_chunk
     
-    # Save final merged result for debugging
-    debug_dir = "extraction_output/debug"
-    os.makedirs(debug_dir, exist_ok=True)
-    final_output_file = os.path.join(debug_dir, "final_merged_output.json")
-    with open(final_output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-    print(f"[Merge] Saved final output to: {final_output_file}")
+    request_logger.info(f"[Merge] Final structure sections: {list(result.keys())}")
     
     # Ensure all required sections exist (even if empty)
     if "sectionA" not in result:
@@ -778,347 +1146,112 @@ def merge_extracted_data(all_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
     return result
 
 
-# Model for manual Section A data from frontend
-class SectionAManualData(BaseModel):
-    contactName: Optional[str] = None
-    contactDesignation: Optional[str] = None
-    contactPhone: Optional[str] = None
-    contactEmail: Optional[str] = None
-    reportingBoundary: Optional[str] = None
-    employees: Optional[dict] = None  # {permanent: {male, female, total}, otherThanPermanent: {male, female, total}}
-    workers: Optional[dict] = None    # {permanent: {male, female, total}, otherThanPermanent: {male, female, total}}
-    turnover: Optional[dict] = None   # {employees: {male, female, total}, workers: {male, female, total}}
-
+def _manual_headcount(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a manual employees/workers payload to {group: {male, female, total}}.
 
-# Model for manual Section B data from frontend
-# NOTE: Manual form only allows Policy Matrix + policyWebLink input
-# All other Section B fields are extracted by AI from PDF only
-class SectionBManualData(BaseModel):
-    policyMatrix: Optional[dict] = None  # {p1-p9: {hasPolicy, approvedByBoard, webLink, translatedToProcedures}}
-    policyWebLink: Optional[str] = None
-
-
-@app.post("/api/extract")
-async def extract_brsr_data(
-    request: Request,
-    files: List[UploadFile] = File(...),
-    sectionAManualData: Optional[str] = Form(None),
-    sectionBManualData: Optional[str] = Form(None),
-    sectionCP1ManualData: Optional[str] = Form(None)
-):
-    """Extract BRSR data from uploaded PDF/Excel files using Gemini with parallel processing.
-    Accepts multiple files and processes them in parallel for faster extraction.
-    Accepts optional manual Section A/B data from frontend which takes precedence over extracted data.
+    Only the groups the caller actually sent (permanent / otherThanPermanent) are kept.
     """
-    
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded")
-    
-    print(f"[Files] Received {len(files)} file(s) for extraction")
-    try:
-        form_raw = await request.form()
-        keys = list(form_raw.keys())
-        print(f"[Debug] Raw multipart form fields received: {keys}")
-        # If manual fields are present as strings, show small snippet
-        # Show a short preview of non-file form fields (if any)
-        for key, val in form_raw.items():
-            if key != 'files':
-                try:
-                    val_preview = (val if isinstance(val, str) else str(val))[:300]
-                    print(f"[Debug] {key} preview: {val_preview}")
-                except Exception:
-                    pass
-    except Exception as e:
-        print(f"[Debug] Could not read raw form: {e}")
-    
-    # Validate file types
-    for file in files:
-        filename = file.filename.lower()
-        if not any(filename.endswith(ext) for ext in ['.pdf', '.xlsx', '.xls']):
-            raise HTTPException(status_code=400, detail=f"File {file.filename}: Only PDF and Excel files are supported")
-    
-    # Parse manual Section A data if provided
-    manual_data = None
-    if sectionAManualData:
-        try:
-            manual_data = json.loads(sectionAManualData)
-            print(f"[Manual Data] Received Section A manual inputs: {list(manual_data.keys())}")
-        except json.JSONDecodeError as e:
-            print(f"[Warning] Could not parse manual Section A data: {e}")
-
-    # Normalize manual Section A data: replace empty strings/None with 'NIL' and ensure numeric fields exist
-    if manual_data:
-        try:
-            manual_data = fill_nil_defaults(manual_data)
-            # Log employee/worker subtotals if present for debugging
-            emp = manual_data.get('employees', {})
-            wk = manual_data.get('workers', {})
-            def _summary(prefix, obj):
-                if not isinstance(obj, dict):
-                    return ''
-                perm = obj.get('permanent', {})
-                other = obj.get('otherThanPermanent', {})
-                return f"{prefix} perm(m={perm.get('male')},f={perm.get('female')},t={perm.get('total')}) oth(m={other.get('male')},f={other.get('female')},t={other.get('total')})"
-            print(f"[Manual Data] Section A employees summary: {_summary('Employees', emp)}")
-            print(f"[Manual Data] Section A workers summary: {_summary('Workers', wk)}")
-        except Exception as e:
-            print(f"[Warning] fill_nil_defaults failed for Section A manual data: {e}")
-    
-    # Parse manual Section B data if provided
-    manual_data_b = None
-    if sectionBManualData:
-        try:
-            manual_data_b = json.loads(sectionBManualData)
-            print(f"[Manual Data] Received Section B manual inputs: {list(manual_data_b.keys())}")
-        except json.JSONDecodeError as e:
-            print(f"[Warning] Could not parse manual Section B data: {e}")
+    out = {}
+    for group in HEADCOUNT_GROUPS:
+        counts = data.get(group)
+        if isinstance(counts, dict):
+            out[group] = {"male": counts.get("male", 0), "female": counts.get("female", 0), "total": counts.get("total", 0)}
+    return out
+
+
+def merge_manual_data(
+    extracted_data: Dict[str, Any],
+    manual_data: Optional[Dict[str, Any]] = None,
+    manual_data_b: Optional[Dict[str, Any]] = None,
+    manual_data_cp1: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Overlay manual Section A/B/C inputs from the frontend onto extracted data.
+
+    User data always takes precedence over AI extraction. Returns `extracted_data`
+    (modified in place); when no manual input was supplied it is returned untouched.
+    """
+    if not any((manual_data, manual_data_b, manual_data_cp1)):
+        return extracted_data
 
-    # Parse manual Section C P1 data if provided
-    manual_data_cp1 = None
-    if sectionCP1ManualData:
-        try:
-            manual_data_cp1 = json.loads(sectionCP1ManualData)
-            # Apply NIL defaults so empty strings become 'NIL' for persistence
-            try:
-                manual_data_cp1 = fill_nil_defaults(manual_data_cp1)
-                print("[Manual Data] Section C P1 after fill_nil_defaults applied")
-            except Exception as e:
-                print(f"[Warning] fill_nil_defaults failed for CP1: {e}")
-            top_keys = list(manual_data_cp1.keys()) if isinstance(manual_data_cp1, dict) else []
-            print(f"[Manual Data] Received Section C P1 manual inputs - top keys: {top_keys}")
-            snippet = json.dumps(manual_data_cp1, indent=2)[:1000]
-            print(f"[Manual Data] Section C P1 (snippet): {snippet}")
-        except json.JSONDecodeError as e:
-            print(f"[Warning] Could not parse manual Section C P1 data: {e}")
-    
-    # Section C manual inputs are accepted for Principle 1 (sectionCP1ManualData).
-    
-    # Extract text from all files and combine
-    combined_text = ""
-    for idx, file in enumerate(files):
-        filename = file.filename.lower()
-        file_content = await file.read()
-        
-        # Extract text based on file type
-        if filename.endswith('.pdf'):
-            text = extract_text_from_pdf(file_content)
-        else:
-            text = extract_text_from_excel(file_content)
-        
-        print(f"[Extract] File {idx + 1}/{len(files)} ({file.filename}): {len(text)} characters")
-        
-        # Add separator between files for AI context
-        if combined_text:
-            combined_text += f"\n\n{'='*80}\n[FILE: {file.filename}]\n{'='*80}\n\n"
-        combined_text += text
-    
-    print(f"[Extract] Total combined text: {len(combined_text)} characters from {len(files)} file(s)")
-    
-    # Use combined text for extraction
-    text = combined_text
-    
-    # If combined extracted text is very small, allow request to proceed when the user
-    # provided manual Section A data (manual inputs should be accepted even for small PDFs).
-    # Also allow when manual Section C P1 data is provided (user intends to submit manual P1)
-    if len(text) < 100 and not manual_data and not manual_data_cp1:
-        raise HTTPException(status_code=400, detail="Could not extract sufficient text from file")
-    
-    # Create output directory for JSON files
-    from datetime import datetime
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = f"extraction_output/{timestamp}"
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"[Output] Saving extraction results to: {output_dir}")
-    
-    chunks = get_extraction_chunks()
-    all_chunk_results = []
-    failed_chunks = []
-    
-    # Check if parallel processing is enabled
-    if GEMINI_CONFIG.get("enable_parallel_processing", True):
-        print(f"\n[Parallel Mode] Processing {len(chunks)} chunks simultaneously...")
-        
-        # Process all chunks in parallel using asyncio.gather
-        async def process_chunk_wrapper(i, chunk):
-            try:
-                print(f"[Started] Chunk {i+1}/{len(chunks)}: {chunk['name']}")
-                chunk_data = await extract_chunk_with_gemini(text, chunk, manual_data, manual_data_b, manual_data_cp1, None)
-                
-                # Save individual chunk result
-                chunk_file = f"{output_dir}/chunk_{i+1}_{chunk['id']}.json"
-                with open(chunk_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "chunk_id": chunk["id"],
-                        "chunk_name": chunk["name"],
-                        "timestamp": timestamp,
-                        "data": chunk_data
-                    }, f, indent=2, ensure_ascii=False)
-                print(f"[Completed] Chunk {i+1}: {chunk['name']} - Saved to {chunk_file}")
-                
-                return (chunk["id"], chunk_data, chunk['name'] if not chunk_data else None)
-            except Exception as e:
-                print(f"[Error] Chunk {i+1} ({chunk['id']}) failed: {e}")
-                return (chunk["id"], {}, chunk['name'])
-        
-        # Run all chunks in parallel
-        results = await asyncio.gather(*[process_chunk_wrapper(i, chunk) for i, chunk in enumerate(chunks)])
-        
-        # Process results
-        for chunk_id, chunk_data, failed_name in results:
-            all_chunk_results.append((chunk_id, chunk_data))
-            if failed_name:
-                failed_chunks.append(failed_name)
-    
-    else:
-        # Sequential processing (original behavior)
-        print(f"\n[Sequential Mode] Processing {len(chunks)} chunks one by one...")
-        for i, chunk in enumerate(chunks):
-            print(f"\n[Progress] Processing chunk {i+1}/{len(chunks)}: {chunk['name']}")
-            
-            try:
-                chunk_data = await extract_chunk_with_gemini(text, chunk, manual_data, manual_data_b, manual_data_cp1, None)
-                all_chunk_results.append((chunk["id"], chunk_data))
-                
-                # Save individual chunk result to JSON file
-                chunk_file = f"{output_dir}/chunk_{i+1}_{chunk['id']}.json"
-                with open(chunk_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "chunk_id": chunk["id"],
-                        "chunk_name": chunk["name"],
-                        "timestamp": timestamp,
-                        "data": chunk_data
-                    }, f, indent=2, ensure_ascii=False)
-                print(f"[Saved] {chunk_file}")
-                
-                if not chunk_data:
-                    failed_chunks.append(chunk['name'])
-                
-                # Delay between chunks
-                if i < len(chunks) - 1:
-                    delay = chunk.get("delay_seconds", GEMINI_CONFIG["delay_between_chunks"])
-                    print(f"[Delay] Waiting {delay}s before next chunk...")
-                    await asyncio.sleep(delay)
-                    
-            except Exception as e:
-                print(f"[Error] Chunk {chunk['id']} failed: {e}")
-                failed_chunks.append(chunk['name'])
-                all_chunk_results.append((chunk["id"], {}))
-    
-    # Merge all chunks
-    extracted_data = merge_extracted_data(all_chunk_results)
-    
     # Merge manual Section A data - USER DATA ALWAYS WINS (takes precedence over AI)
     if manual_data:
-        print(f"[Merge] Merging manual Section A data (user data takes precedence)...")
+        request_logger.info(f"[Merge] Merging manual Section A data (user data takes precedence)...")
         if "sectionA" not in extracted_data:
             extracted_data["sectionA"] = {}
         
         # User-provided data always overrides AI extraction - completely replace fields
-        for field in ["contactName", "contactDesignation", "contactPhone", "contactEmail", "reportingBoundary"]:
+        for field in SECTION_A_CONTACT_FIELDS:
             if manual_data.get(field):
                 extracted_data["sectionA"][field] = manual_data[field]
-                print(f"[Merge] Using user {field}")
+                request_logger.info(f"[Merge] Using user {field}")
         
         # Employee counts - COMPLETELY REPLACE with user data
         if manual_data.get("employees"):
             emp_data = manual_data["employees"]
-            extracted_data["sectionA"]["employees"] = {
-                "permanent": {
-                    "male": emp_data.get("permanent", {}).get("male", 0),
-                    "female": emp_data.get("permanent", {}).get("female", 0),
-                    "total": emp_data.get("permanent", {}).get("total", 0)
-                },
-                "otherThanPermanent": {
-                    "male": emp_data.get("otherThanPermanent", {}).get("male", 0),
-                    "female": emp_data.get("otherThanPermanent", {}).get("female", 0),
-                    "total": emp_data.get("otherThanPermanent", {}).get("total", 0)
-                }
-            }
-            print(f"[Merge] REPLACED employees with user data: Perm={emp_data.get('permanent', {})}, Other={emp_data.get('otherThanPermanent', {})}")
+            extracted_data["sectionA"]["employees"] = _manual_headcount(emp_data)
+            request_logger.info(f"[Merge] REPLACED employees with user data: Perm={emp_data.get('permanent', {})}, Other={emp_data.get('otherThanPermanent', {})}")
         
         # Worker counts - COMPLETELY REPLACE with user data
         if manual_data.get("workers"):
             worker_data = manual_data["workers"]
-            extracted_data["sectionA"]["workers"] = {
-                "permanent": {
-                    "male": worker_data.get("permanent", {}).get("male", 0),
-                    "female": worker_data.get("permanent", {}).get("female", 0),
-                    "total": worker_data.get("permanent", {}).get("total", 0)
-                },
-                "otherThanPermanent": {
-                    "male": worker_data.get("otherThanPermanent", {}).get("male", 0),
-                    "female": worker_data.get("otherThanPermanent", {}).get("female", 0),
-                    "total": worker_data.get("otherThanPermanent", {}).get("total", 0)
-                }
-            }
-            print(f"[Merge] REPLACED workers with user data")
+            extracted_data["sectionA"]["workers"] = _manual_headcount(worker_data)
+            request_logger.info(f"[Merge] REPLACED workers with user data")
         
         # Turnover rates - COMPLETELY REPLACE with user data
         if manual_data.get("turnover"):
             extracted_data["sectionA"]["turnover"] = manual_data["turnover"]
-            print(f"[Merge] REPLACED turnover with user data")
+            request_logger.info(f"[Merge] REPLACED turnover with user data")
         
-        print(f"[Merge] User data successfully merged - user inputs take precedence over AI")
+        request_logger.info(f"[Merge] User data successfully merged - user inputs take precedence over AI")
     
     # Merge manual Section B data - USER DATA ALWAYS WINS (takes precedence over AI)
     # NOTE: Manual form only allows Policy Matrix + policyWebLink. All other fields extracted by AI.
     if manual_data_b:
-        print(f"[Merge] Merging manual Section B data (user data takes precedence)...")
+        request_logger.info(f"[Merge] Merging manual Section B data (user data takes precedence)...")
         if "sectionB" not in extracted_data:
             extracted_data["sectionB"] = {}
         
         # Policy Matrix (P1-P9) - COMPLETELY REPLACE with user data
         if manual_data_b.get("policyMatrix"):
-            extracted_data["sectionB"]["policyMatrix"] = {}
+            pm = manual_data_b["policyMatrix"]
+            pmx_dst = extracted_data["sectionB"]["policyMatrix"] = {}
             
-            for principle in ["p1", "p2", "p3", "p4", "p5", "p6", "p7", "p8", "p9"]:
-                if principle in manual_data_b["policyMatrix"]:
-                    policy_data = manual_data_b["policyMatrix"][principle]
-                    extracted_data["sectionB"]["policyMatrix"][principle] = {
-                        "hasPolicy": "Y" if policy_data.get("hasPolicy") else "N",
-                        "approvedByBoard": "Y" if policy_data.get("approvedByBoard") else "N",
-                        "translatedToProcedures": "Y" if policy_data.get("translatedToProcedures") else "N",
-                        "webLink": policy_data.get("webLink", "")
-                    }
-                else:
+            for principle in PRINCIPLES:
+                policy_data = pm.get(principle)
+                if policy_data is None:
                     # If user didn't provide this principle, use defaults
-                    extracted_data["sectionB"]["policyMatrix"][principle] = {
-                        "hasPolicy": "N",
-                        "approvedByBoard": "N",
-                        "translatedToProcedures": "N",
-                        "webLink": ""
-                    }
+                    pmx_dst[principle] = _DEFAULT_POLICY_ROW.copy()
+                    continue
+                pmx_dst[principle] = {
+                    "hasPolicy": "Y" if policy_data.get("hasPolicy") else "N",
+                    "approvedByBoard": "Y" if policy_data.get("approvedByBoard") else "N",
+                    "translatedToProcedures": "Y" if policy_data.get("translatedToProcedures") else "N",
+                    "webLink": policy_data.get("webLink", "")
+                }
             
-            print(f"[Merge] REPLACED Policy Matrix with user data for all 9 principles")
+            request_logger.info(f"[Merge] REPLACED Policy Matrix with user data for all 9 principles")
         
         # General Policy Web Link - User data wins
         if manual_data_b.get("policyWebLink"):
             extracted_data["sectionB"]["policyWebLink"] = manual_data_b["policyWebLink"]
-            print(f"[Merge] Using user policyWebLink")
+            request_logger.info(f"[Merge] Using user policyWebLink")
 
         # Simple text fields
-        for k in [
-            "valueChainExtension",
-            "certifications",
-            "commitments",
-            "performance",
-            "directorStatement",
-            "sustainabilityCommittee",
-        ]:
+        for k in SIMPLE_TEXT_FIELDS_B:
             v = manual_data_b.get(k)
             if isinstance(v, str) and v.strip():
                 extracted_data["sectionB"][k] = v
-                print(f"[Merge] Using user {k}")
+                request_logger.info(f"[Merge] Using user {k}")
 
         # Highest Authority object
         if isinstance(manual_data_b.get("highestAuthority"), dict):
             ha = manual_data_b["highestAuthority"]
             if "highestAuthority" not in extracted_data["sectionB"]:
                 extracted_data["sectionB"]["highestAuthority"] = {}
-            for f in ["name", "designation", "din", "email", "phone"]:
+            for f in HIGHEST_AUTHORITY_FIELDS:
                 if f in ha and isinstance(ha[f], str) and ha[f].strip():
                     extracted_data["sectionB"]["highestAuthority"][f] = ha[f]
-            print("[Merge] Using user highestAuthority details")
+            request_logger.info("[Merge] Using user highestAuthority details")
 
         # Review: performance p1..p9, frequency, compliance
         if isinstance(manual_data_b.get("review"), dict):
@@ -1130,7 +1263,7 @@ async def extract_brsr_data(
             if isinstance(perf, dict):
                 if "performance" not in extracted_data["sectionB"]["review"]:
                     extracted_data["sectionB"]["review"]["performance"] = {}
-                for p in ["p1","p2","p3","p4","p5","p6","p7","p8","p9"]:
+                for p in PRINCIPLES:
                     if isinstance(perf.get(p), str) and perf.get(p).strip():
                         extracted_data["sectionB"]["review"]["performance"][p] = perf[p]
             # frequency and compliance
@@ -1138,75 +1271,351 @@ async def extract_brsr_data(
                 extracted_data["sectionB"]["review"]["performanceFrequency"] = rev["performanceFrequency"]
             if isinstance(rev.get("compliance"), str) and rev["compliance"].strip():
                 extracted_data["sectionB"]["review"]["compliance"] = rev["compliance"]
-            print("[Merge] Using user review fields where provided")
+            request_logger.info("[Merge] Using user review fields where provided")
 
         # Independent Assessment p1..p9
         if isinstance(manual_data_b.get("independentAssessment"), dict):
             ia = manual_data_b["independentAssessment"]
             if "independentAssessment" not in extracted_data["sectionB"]:
                 extracted_data["sectionB"]["independentAssessment"] = {}
-            for p in ["p1","p2","p3","p4","p5","p6","p7","p8","p9"]:
+            for p in PRINCIPLES:
                 if isinstance(ia.get(p), str) and ia.get(p).strip():
                     extracted_data["sectionB"]["independentAssessment"][p] = ia[p]
-            print("[Merge] Using user independentAssessment where provided")
+            request_logger.info("[Merge] Using user independentAssessment where provided")
 
         # No Policy Reasons - all sub-objects p1..p9
         npr = manual_data_b.get("noPolicyReasons")
         if isinstance(npr, dict):
             if "noPolicyReasons" not in extracted_data["sectionB"]:
                 extracted_data["sectionB"]["noPolicyReasons"] = {}
-            for sub in ["notMaterial", "notReady", "noResources", "plannedNextYear", "otherReason"]:
+            npr_dst = extracted_data["sectionB"]["noPolicyReasons"]
+            for sub in NOPOLICY_SUBKEYS:
                 sub_data = npr.get(sub)
-                if isinstance(sub_data, dict):
-                    if sub not in extracted_data["sectionB"]["noPolicyReasons"]:
-                        extracted_data["sectionB"]["noPolicyReasons"][sub] = {}
-                    for p in ["p1","p2","p3","p4","p5","p6","p7","p8","p9"]:
-                        if isinstance(sub_data.get(p), str) and sub_data.get(p).strip():
-                            extracted_data["sectionB"]["noPolicyReasons"][sub][p] = sub_data[p]
-                    print(f"[Merge] Using user noPolicyReasons.{sub} where provided")
+                # Frontend usually sends only the 1-2 principles the user filled in,
+                # so walk the keys actually present instead of all nine.
+                if not isinstance(sub_data, dict) or not sub_data:
+                    continue
+                dst = npr_dst.setdefault(sub, {})
+                for p, v in sub_data.items():
+                    if p in _PRINCIPLE_KEYS and type(v) is str and v and not v.isspace():
+                        dst[p] = v
+                request_logger.info(f"[Merge] Using user noPolicyReasons.{sub} where provided")
         
-        print(f"[Merge] Section B user data successfully merged - user inputs take precedence over AI")
-
-    # Merge manual Section C P1 data - USER DATA ALWAYS WINS (force overwrite AI)
-    if manual_data_cp1:
-        print("[Merge] Overwriting Section C P1 with user-provided data (user data authoritative)")
-        if "sectionC" not in extracted_data:
-            extracted_data["sectionC"] = {}
-        # Assign user object directly to avoid AI overwrites
-        extracted_data["sectionC"]["principle1"] = manual_data_cp1
-        print("[Merge] Section C P1 replaced with user data")
-
-    # Section C manual merging handled above (P1). CP2 not supported yet.
-    
-    # Save merged final result
-    final_file = f"{output_dir}/final_merged_data.json"
-    with open(final_file, 'w', encoding='utf-8') as f:
-        json.dump({
+        request_logger.info(f"[Merge] Section B user data successfully merged - user inputs take precedence over AI")
+
+    # Merge manual Section C principle data - USER DATA ALWAYS WINS (force overwrite AI)
+    # Only P1 is accepted today; further principles just need a (payload, key) pair here.
+    cp_sources = ((manual_data_cp1, "principle1"),)
+    cp_updates = {key: obj for obj, key in cp_sources if obj}
+    if cp_updates:
+        request_logger.info(f"[Merge] Overwriting Section C {list(cp_updates)} with user-provided data (user data authoritative)")
+        # Assign user objects directly (single update) to avoid AI overwrites
+        extracted_data.setdefault("sectionC", {}).update(cp_updates)
+        request_logger.info("[Merge] Section C replaced with user data")
+
+    return extracted_data
+
+
+# Model for manual Section A data from frontend
+class SectionAManualData(BaseModel):
+    contactName: Optional[str] = None
+    contactDesignation: Optional[str] = None
+    contactPhone: Optional[str] = None
+    contactEmail: Optional[str] = None
+    reportingBoundary: Optional[str] = None
+    employees: Optional[dict] = None  # {permanent: {male, female, total}, otherThanPermanent: {male, female, total}}
+    workers: Optional[dict] = None    # {permanent: {male, female, total}, otherThanPermanent: {male, female, total}}
+    turnover: Optional[dict] = None   # {employees: {male, female, total}, workers: {male, female, total}}
+
+
+# Model for manual Section B data from frontend
+# NOTE: Manual form only allows Policy Matrix + policyWebLink input
+# All other Section B fields are extracted by AI from PDF only
+class SectionBManualData(BaseModel):
+    policyMatrix: Optional[dict] = None  # {p1-p9: {hasPolicy, approvedByBoard, webLink, translatedToProcedures}}
+    policyWebLink: Optional[str] = None
+
+
+# Upload extensions accepted by /api/extract (str.endswith takes the tuple directly)
+_ALLOWED_EXTS = ('.pdf', '.xlsx', '.xls')
+
+
+@app.post("/api/extract", response_class=ORJSONResponse if orjson else JSONResponse)
+async def extract_brsr_data(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    sectionAManualData: Optional[str] = Form(None),
+    sectionBManualData: Optional[str] = Form(None),
+    sectionCP1ManualData: Optional[str] = Form(None),
+    return_data: bool = True
+):
+    """Extract BRSR data from uploaded PDF/Excel files using Gemini with parallel processing.
+    Accepts multiple files and processes them in parallel for faster extraction.
+    Accepts optional manual Section A/B data from frontend which takes precedence over extracted data.
+    With `?return_data=false` the merged data is omitted from the response; fetch it
+    afterwards from `/api/results/{resultId}`.
+    """
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+    
+        request_logger.info(f"[Files] Received {len(files)} file(s) for extraction")
+        try:
+            form_raw = await request.form()
+            keys = list(form_raw.keys())
+            request_logger.debug(f"[Debug] Raw multipart form fields received: {keys}")
+            # If manual fields are present as strings, show small snippet
+            # Show a short preview of non-file form fields (if any)
+            for key, val in form_raw.items():
+                if key != 'files':
+                    try:
+                        val_preview = (val if isinstance(val, str) else str(val))[:300]
+                        request_logger.debug(f"[Debug] {key} preview: {val_preview}")
+                    except Exception:
+                        pass
+        except Exception as e:
+            request_logger.debug(f"[Debug] Could not read raw form: {e}")
+    
+        # Validate file types
+        for file in files:
+            filename = file.filename.lower()
+            if not filename.endswith(_ALLOWED_EXTS):
+                raise HTTPException(status_code=400, detail=f"File {file.filename}: Only PDF and Excel files are supported")
+    
+        # Parse manual Section A data if provided
+        manual_data = None
+        if sectionAManualData:
+            try:
+                manual_data = _json_loads(sectionAManualData)
+                request_logger.info(f"[Manual Data] Received Section A manual inputs: {list(manual_data.keys())}")
+            except json.JSONDecodeError as e:
+                request_logger.warning(f"[Warning] Could not parse manual Section A data: {e}")
+
+        # Normalize manual Section A data: replace empty strings/None with 'NIL' and ensure numeric fields exist
+        if manual_data:
+            try:
+                manual_data = fill_nil_defaults(manual_data)
+                # Log employee/worker subtotals if present for debugging
+                emp = manual_data.get('employees', {})
+                wk = manual_data.get('workers', {})
+                def _summary(prefix, obj):
+                    if not isinstance(obj, dict):
+                        return ''
+                    perm = obj.get('permanent', {})
+                    other = obj.get('otherThanPermanent', {})
+                    return f"{prefix} perm(m={perm.get('male')},f={perm.get('female')},t={perm.get('total')}) oth(m={other.get('male')},f={other.get('female')},t={other.get('total')})"
+                request_logger.info(f"[Manual Data] Section A employees summary: {_summary('Employees', emp)}")
+                request_logger.info(f"[Manual Data] Section A workers summary: {_summary('Workers', wk)}")
+            except Exception as e:
+                request_logger.warning(f"[Warning] fill_nil_defaults failed for Section A manual data: {e}")
+    
+        # Parse manual Section B data if provided
+        manual_data_b = None
+        if sectionBManualData:
+            try:
+                manual_data_b = _json_loads(sectionBManualData)
+                request_logger.info(f"[Manual Data] Received Section B manual inputs: {list(manual_data_b.keys())}")
+            except json.JSONDecodeError as e:
+                request_logger.warning(f"[Warning] Could not parse manual Section B data: {e}")
+
+        # Parse manual Section C P1 data if provided
+        manual_data_cp1 = None
+        if sectionCP1ManualData:
+            try:
+                manual_data_cp1 = _json_loads(sectionCP1ManualData)
+                # Apply NIL defaults so empty strings become 'NIL' for persistence
+                try:
+                    manual_data_cp1 = fill_nil_defaults(manual_data_cp1)
+                    request_logger.info("[Manual Data] Section C P1 after fill_nil_defaults applied")
+                except Exception as e:
+                    request_logger.warning(f"[Warning] fill_nil_defaults failed for CP1: {e}")
+                top_keys = list(manual_data_cp1.keys()) if isinstance(manual_data_cp1, dict) else []
+                request_logger.info(f"[Manual Data] Received Section C P1 manual inputs - top keys: {top_keys}")
+                snippet = _json_bytes(manual_data_cp1, indent=True)[:1000].decode(errors="ignore")
+                request_logger.info(f"[Manual Data] Section C P1 (snippet): {snippet}")
+            except json.JSONDecodeError as e:
+                request_logger.warning(f"[Warning] Could not parse manual Section C P1 data: {e}")
+    
+        # Section C manual inputs are accepted for Principle 1 (sectionCP1ManualData).
+    
+        # Extract text from all files and combine (joined once; the raw upload bytes are
+        # released as soon as each file is parsed)
+        text_parts = []
+        combined_len = 0
+        for idx, file in enumerate(files):
+            filename = file.filename.lower()
+            file_content = await file.read()
+        
+            # Extract text based on file type
+            if filename.endswith('.pdf'):
+                text = await asyncio.to_thread(extract_text_from_pdf, file_content)
+            else:
+                text = await asyncio.to_thread(extract_text_from_excel, file_content)
+            del file_content
+            await file.close()
+        
+            request_logger.info(f"[Extract] File {idx + 1}/{len(files)} ({file.filename}): {len(text)} characters")
+        
+            # Add separator between files for AI context
+            if combined_len:
+                text_parts.append(f"\n\n{'='*80}\n[FILE: {file.filename}]\n{'='*80}\n\n")
+            text_parts.append(text)
+            combined_len += len(text)
+        combined_text = "".join(text_parts)
+        del text_parts
+    
+        request_logger.info(f"[Extract] Total combined text: {len(combined_text)} characters from {len(files)} file(s)")
+    
+        # Use combined text for extraction
+        text = combined_text
+    
+        # If combined extracted text is very small, allow request to proceed when the user
+        # provided manual Section A data (manual inputs should be accepted even for small PDFs).
+        # Also allow when manual Section C P1 data is provided (user intends to submit manual P1)
+        if len(text) < 100 and not manual_data and not manual_data_cp1:
+            raise HTTPException(status_code=400, detail="Could not extract sufficient text from file")
+    
+        # Create output directory for JSON files (new per request, so not memoized)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        result_id = f"{timestamp}_{uuid.uuid4().hex[:8]}"
+        output_dir = f"extraction_output/{result_id}"
+        os.makedirs(output_dir, exist_ok=False)
+        request_logger.info(f"[Output] Saving extraction results to: {output_dir}")
+    
+        chunks = get_extraction_chunks()
+    
+        # Small documents: ask for several chunks per marshaled request, batched so each
+        # response fits the output-token limit (the P1-P2 chunk is left out when manual P1 data
+        # replaces its extraction). Any chunk missing from a marshaled response is extracted
+        # with its own request below.
+        marshaled = {}
+        members = [c for c in chunks if not (manual_data_cp1 and 'sectionC_p1_p2' in c['id'])]
+        if GEMINI_CONFIG["marshal_chunks"] and len(members) > 1 and len(text) < GEMINI_CONFIG["marshal_max_chars"]:
+            batches = [batch for batch in get_marshal_batches(members) if len(batch) > 1]
+            if batches:
+                request_logger.info(f"\n[Marshaled Mode] Extracting {sum(map(len, batches))} chunks with {len(batches)} batched Gemini request(s)...")
+                batch_results = await asyncio.gather(*[
+                    extract_chunk_with_gemini(text, get_marshaled_chunk(batch), manual_data, manual_data_b, manual_data_cp1, None)
+                    for batch in batches
+                ], return_exceptions=True)
+                for batch_result in batch_results:
+                    if isinstance(batch_result, Exception):
+                        request_logger.error(f"[Error] Marshaled request failed, falling back to per-chunk requests: {batch_result}")
+                        continue
+                    marshaled.update({cid: data for cid, data in batch_result.items() if data})
+                request_logger.info(f"[Marshaled Mode] Got {len(marshaled)}/{len(members)} chunks; remaining chunks use their own request")
+    
+        # Chunks with a cached response need no Gemini call; look them up before deciding
+        # whether the document is worth uploading as cached context
+        ready = dict(marshaled)
+        remaining = [c for c in members if c["id"] not in ready]
+        cached_results = await asyncio.gather(*[cached_chunk_response(text, c, manual_data, manual_data_b) for c in remaining])
+        for c, chunk_data in zip(remaining, cached_results):
+            if chunk_data:
+                request_logger.info(f"[Chunk: {c['id']}] Using cached response")
+                ready[c["id"]] = chunk_data
+    
+        # Several per-chunk requests over the same large document: upload it once as cached context
+        doc_cache = None
+        if sum(1 for c in members if c["id"] not in ready) > 1:
+            doc_cache = await create_document_cache(text)
+    
+        # Every chunk's Gemini call is in flight at once; _gemini_sem/_gemini_bucket bound the rate
+        request_logger.info(f"\n[Parallel Mode] Processing {len(chunks)} chunks simultaneously...")
+        pending_writes = []
+    
+        async def process_chunk(i, chunk):
+            chunk_data = ready.get(chunk["id"])
+            if chunk_data is None:
+                request_logger.info(f"[Started] Chunk {i+1}/{len(chunks)}: {chunk['name']}")
+                chunk_data = await extract_chunk_with_gemini(text, chunk, manual_data, manual_data_b, manual_data_cp1, None, doc_cache)
+        
+            # Debug only: individual chunk results are written together once every chunk is done
+            if BRSR_DEBUG:
+                chunk_file = f"{output_dir}/chunk_{i+1}_{chunk['id']}.json"
+                pending_writes.append((chunk_file, {
+                    "chunk_id": chunk["id"],
+                    "chunk_name": chunk["name"],
+                    "timestamp": timestamp,
+                    "data": chunk_data
+                }))
+            request_logger.info(f"[Completed] Chunk {i+1}: {chunk['name']}")
+            return chunk_data
+    
+        results = await asyncio.gather(*[process_chunk(i, chunk) for i, chunk in enumerate(chunks)], return_exceptions=True)
+    
+        # gather preserves chunk order, so results line up with chunks index for index
+        for i, chunk_data in enumerate(results):
+            if isinstance(chunk_data, Exception):
+                request_logger.error(f"[Error] Chunk {i+1} ({chunks[i]['id']}) failed: {chunk_data}")
+                results[i] = {}
+        all_chunk_results = list(zip([chunk["id"] for chunk in chunks], results))
+        failed_chunks = [chunk['name'] for chunk, chunk_data in zip(chunks, results) if not chunk_data]
+    
+        if doc_cache is not None:
+            await asyncio.to_thread(delete_document_cache, doc_cache)
+    
+        # Merge all chunks
+        extracted_data = merge_extracted_data(all_chunk_results)
+    
+        # Debug only: chunk files + the merged AI output (before manual data is applied)
+        if BRSR_DEBUG:
+            debug_dir = "extraction_output/debug"
+            _ensure_dir(debug_dir)
+            pending_writes.append((os.path.join(debug_dir, "final_merged_output.json"), extracted_data))
+            await _dump_json_batch(pending_writes)
+            request_logger.debug(f"[Saved] {len(pending_writes) - 1} chunk file(s) to {output_dir} and merged output to {debug_dir}")
+    
+        # Apply manual (user) inputs on top of the AI-extracted data
+        extracted_data = merge_manual_data(extracted_data, manual_data, manual_data_b, manual_data_cp1)
+
+        # Save merged final result
+        final_file = f"{output_dir}/final_merged_data.json"
+        final_bytes = _json_bytes({
             "timestamp": timestamp,
             "source_file": file.filename,
             "total_chunks": len(chunks),
             "successful_chunks": len(chunks) - len(failed_chunks),
             "failed_chunks": failed_chunks,
             "merged_data": extracted_data
-        }, f, indent=2, ensure_ascii=False)
-    print(f"[Saved] Final merged data: {final_file}")
-    
-    success_count = len(chunks) - len(failed_chunks)
-    
-    file_names = ", ".join([f.filename for f in files])
-    
-    return {
-        "success": success_count > 0,
-        "data": extracted_data,
-        "message": f"Extracted BRSR data from {len(files)} file(s): {file_names}",
-        "reportType": "BRSR Annexure 1 (Full Report)",
-        "stats": {
-            "totalFiles": len(files),
-            "totalChunks": len(chunks),
-            "successfulChunks": success_count,
-            "failedChunks": failed_chunks
+        }, indent=BRSR_DEBUG)
+        await asyncio.get_running_loop().run_in_executor(None, _write_bytes, final_file, final_bytes)
+        request_logger.info(f"[Saved] Final merged data: {final_file}")
+    
+        success_count = len(chunks) - len(failed_chunks)
+    
+        file_names = ", ".join([f.filename for f in files])
+    
+        response = {
+            "success": success_count > 0,
+            "resultId": result_id,
+            "message": f"Extracted BRSR data from {len(files)} file(s): {file_names}",
+            "reportType": "BRSR Annexure 1 (Full Report)",
+            "stats": {
+                "totalFiles": len(files),
+                "totalChunks": len(chunks),
+                "successfulChunks": success_count,
+                "failedChunks": failed_chunks
+            }
         }
-    }
+        if return_data:
+            response["data"] = extracted_data
+        return response
+    finally:
+        # Flush on every exit (HTTPException included) so this request's buffered lines
+        # are written now, not later under another request
+        _request_log_handler.flush()
+
+
+@app.get("/api/results/{result_id}")
+async def get_extraction_result(result_id: str):
+    """Serve a previously persisted final_merged_data.json by its `resultId`."""
+    if not _RESULT_ID_RE.fullmatch(result_id):
+        raise HTTPException(status_code=404, detail="Result not found")
+    final_file = f"extraction_output/{result_id}/final_merged_data.json"
+    if not os.path.exists(final_file):
+        raise HTTPException(status_code=404, detail="Result not found")
+    return FileResponse(final_file, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -6,9 +6,11 @@ Usage:
 Requires `requests`: pip install requests
 """
 import sys
-import json
 import requests
 
+# orjson when installed, stdlib json otherwise (same helper the backend uses)
+from transform import dumps
+
 if len(sys.argv) < 2:
     print("Usage: python send_manual_post.py <path-to-pdf>")
     sys.exit(1)
@@ -56,8 +58,8 @@ with open(pdf_path, 'rb') as f:
         }
     }
     data = {
-        'sectionAManualData': json.dumps(section_a),
-        'sectionCP1ManualData': json.dumps(p1)
+        'sectionAManualData': dumps(section_a),
+        'sectionCP1ManualData': dumps(p1)
     }
     print(f"Posting to {url} with file {pdf_path} and manual Section A keys: {list(data.keys())}")
     r = requests.post(url, files=files, data=data)
@@ -0,0 +1,156 @@
+"""
+Test script to verify the backend helpers around the Gemini calls: manual (frontend)
+Section A/B/C inputs merged over extracted data, Section B response_schema coverage,
+flat-output normalization, marshaled-request batching, 429 retry delays and the
+token-bucket rate limiter,
+WITHOUT making real API calls (no Gemini key needed).
+"""
+
+import sys
+import time
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from agents import create_sectionB_agent
+from fastapi_brsr_backend import (
+    merge_manual_data,
+    response_schema_for_prompt,
+    normalize_flat_output,
+    get_extraction_chunks,
+    get_marshal_batches,
+    estimate_output_tokens,
+    GEMINI_CONFIG,
+    _retry_delay_seconds,
+    TokenBucket,
+)
+
+# AI-extracted data the manual inputs are applied on top of
+extracted = {
+    "sectionA": {"cin": "L23201DL1959GOI003948", "contactName": "AI Name"},
+    "sectionB": {"policyWebLink": "https://ai.example.com"},
+    "sectionC": {},
+}
+
+manual_a = {
+    "contactName": "User Name",
+    "contactEmail": "user@example.com",
+    "employees": {"permanent": {"male": 10, "female": 5, "total": 15}},
+}
+
+manual_a["workers"] = {"otherThanPermanent": {"male": 3, "female": 1, "total": 4}, "ignored": {"male": 9}}
+manual_a["turnover"] = {"permanentEmployees": {"male": "5%"}}
+manual_cp1 = {"essential": {"q1": "User P1 answer"}}
+
+manual_b = {
+    "policyMatrix": {"p1": {"hasPolicy": True, "approvedByBoard": True, "webLink": "https://p1.example.com"}},
+    "policyWebLink": "https://user.example.com",
+    "highestAuthority": {"name": "Jane Doe", "designation": ""},
+    "noPolicyReasons": {"notMaterial": {"p2": "Not relevant", "p10": "ignored"}},
+}
+
+print("=" * 80)
+print("TESTING MANUAL DATA MERGE")
+print("=" * 80)
+
+result = merge_manual_data(extracted, manual_a, manual_b, manual_cp1)
+sec_a = result.get("sectionA", {})
+sec_b = result.get("sectionB", {})
+policy_matrix = sec_b.get("policyMatrix", {})
+
+print("\n" + "=" * 80)
+print("VALIDATION:")
+print("=" * 80)
+
+checks = [
+    ("Section A: user contactName wins", sec_a.get("contactName") == "User Name"),
+    ("Section A: user contactEmail added", sec_a.get("contactEmail") == "user@example.com"),
+    ("Section A: extracted cin kept", sec_a.get("cin") == "L23201DL1959GOI003948"),
+    ("Section A: employees replaced", sec_a.get("employees") == {"permanent": {"male": 10, "female": 5, "total": 15}}),
+    ("Section A: workers keep only known groups", sec_a.get("workers") == {"otherThanPermanent": {"male": 3, "female": 1, "total": 4}}),
+    ("Section A: turnover replaced", sec_a.get("turnover") == {"permanentEmployees": {"male": "5%"}}),
+    ("Section B: policy matrix has p1-p9", sorted(policy_matrix) == [f"p{i}" for i in range(1, 10)]),
+    ("Section B: p1 row from user", policy_matrix.get("p1", {}).get("hasPolicy") == "Y"
+        and policy_matrix.get("p1", {}).get("webLink") == "https://p1.example.com"),
+    ("Section B: missing principles default to N", policy_matrix.get("p9", {}).get("hasPolicy") == "N"),
+    ("Section B: user policyWebLink wins", sec_b.get("policyWebLink") == "https://user.example.com"),
+    ("Section B: blank authority fields skipped", sec_b.get("highestAuthority") == {"name": "Jane Doe"}),
+    ("Section B: noPolicyReasons p2 kept, unknown keys dropped",
+        sec_b.get("noPolicyReasons") == {"notMaterial": {"p2": "Not relevant"}}),
+    ("Section C: user P1 replaces principle1", result.get("sectionC", {}).get("principle1") is manual_cp1),
+    ("No manual data: input returned untouched", merge_manual_data({"x": 1}) == {"x": 1}),
+]
+
+# Section B's response_schema must list every noPolicyReasons key (5 reasons x p1-p9),
+# otherwise constrained decoding can't return them
+schema_b = response_schema_for_prompt(create_sectionB_agent()["prompt"]) or {}
+expected_npr = {f"sectionb_noPolicyReasons_{sub}_p{i}"
+                for sub in ("notMaterial", "notReady", "noResources", "plannedNextYear", "otherReason")
+                for i in range(1, 10)}
+checks.append(("Section B schema lists all 45 noPolicyReasons keys",
+               expected_npr <= set(schema_b.get("properties", {}))))
+
+# normalize_flat_output: object and legacy key/value-list formats, _array parsing, materialIssues renames
+flat = normalize_flat_output({
+    "sectiona_cin": "L1",
+    "sectiona_products_array": '[{"name": "Oil"}]',
+    "sectiona_notes_array": "[not json",
+    "sectiona_sites_array": '  [{"plant": "Pune"}]\n',
+    "sectiona_markets_array": '```json\n[{"state": "MH"}]\n```',
+    "sectiona_materialIssues_array": [{"materialIssue": "Water", "riskOpportunity": "Risk"}],
+})
+checks += [
+    ("normalize: plain values kept", flat.get("sectiona_cin") == "L1"),
+    ("normalize: JSON string _array parsed", flat.get("sectiona_products_array") == [{"name": "Oil"}]),
+    ("normalize: invalid JSON string kept", flat.get("sectiona_notes_array") == "[not json"),
+    ("normalize: _array with leading whitespace parsed", flat.get("sectiona_sites_array") == [{"plant": "Pune"}]),
+    ("normalize: fenced _array parsed", flat.get("sectiona_markets_array") == [{"state": "MH"}]),
+    ("normalize: materialIssues renamed", flat.get("sectiona_materialIssues_array") == [{"issue": "Water", "type": "Risk"}]),
+    ("normalize: legacy key/value list", normalize_flat_output([{"key": "sectiona_cin", "value": "L2"}, {"bad": 1}]) == {"sectiona_cin": "L2"}),
+    ("normalize: non-dict output -> {}", normalize_flat_output("oops") == {} and normalize_flat_output(None) == {}),
+]
+
+# Marshal batches: every chunk exactly once, in order; no multi-chunk batch over the output budget
+chunks = get_extraction_chunks()
+batches = get_marshal_batches(chunks)
+checks += [
+    ("marshal batches: every chunk once, in order", [c["id"] for b in batches for c in b] == [c["id"] for c in chunks]),
+    ("marshal batches: multi-chunk batches fit the output budget",
+        all(sum(map(estimate_output_tokens, b)) <= GEMINI_CONFIG["marshal_max_output_tokens"] for b in batches if len(b) > 1)),
+    ("marshal batches: not all chunks in one request", len(batches) > 1),
+]
+
+# _retry_delay_seconds: RetryInfo on the error, in its details, or the default
+checks += [
+    ("retry delay: timedelta on error", _retry_delay_seconds(SimpleNamespace(retry_delay=timedelta(seconds=3)), 1) == 3.0),
+    ("retry delay: protobuf Duration in details",
+        _retry_delay_seconds(SimpleNamespace(details=[object(), SimpleNamespace(retry_delay=SimpleNamespace(seconds=2, nanos=500_000_000))]), 1) == 2.5),
+    ("retry delay: default when not advertised", _retry_delay_seconds(ValueError("429"), 7) == 7),
+]
+
+
+# TokenBucket: a full bucket serves `capacity` calls at once, then paces at `rate` per second
+async def _bucket_timings():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    burst = time.monotonic() - start
+    await bucket.acquire()
+    return burst, time.monotonic() - start
+
+burst, paced = asyncio.run(_bucket_timings())
+checks += [
+    ("TokenBucket: burst up to capacity without waiting", burst < 0.02),
+    ("TokenBucket: next call waits ~1/rate", 0.04 <= paced < 0.5),
+]
+
+failed = 0
+for check_name, ok in checks:
+    status = "✅ PASS" if ok else "❌ FAIL"
+    failed += not ok
+    print(f"{status}: {check_name}")
+
+print("\n" + "=" * 80)
+print("TEST COMPLETE" if not failed else f"TEST FAILED ({failed} check(s))")
+print("=" * 80)
+sys.exit(1 if failed else 0)
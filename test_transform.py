@@ -2,8 +2,9 @@
 Test script to verify flat key transformation after agents.py update
 """
 
+import sys
 import json
-from transform import transform_flat_to_nested, flat_to_nested_path
+from transform import transform_flat_to_nested, transform_flat_items, flat_to_nested_path, precompute_paths
 
 # Sample flat data matching the NEW agent prompts
 sample_flat_data = {
@@ -101,5 +102,45 @@ for check_name, result in checks:
     print(f"{status}: {check_name}")
 
 print("\n" + "=" * 80)
-print("TEST COMPLETE")
+print("API CHECKS (transform_flat_items / flat_to_nested_path / precompute_paths):")
 print("=" * 80)
+
+# Streaming input: same result from (key, value) pairs as from the dict, even from a one-shot iterator
+streamed = transform_flat_items(iter(list(sample_flat_data.items())))
+array_result = transform_flat_items([
+    ("sectiona_products_array", "Oil"),
+    ("sectiona_subsidiaries_array", ""),
+    ("sectiona_plants_array", 0),
+    ("sectiona_cin", None),
+])
+
+# Path API: cached tuples, sectiona/sectionA prefixes, other spellings and unknown prefixes rejected
+path = flat_to_nested_path("sectiona_employees_permanent_male")
+precomputed_count = precompute_paths(["sectiona_cin", "foo_bar"])
+
+api_checks = [
+    ("transform_flat_items matches transform_flat_to_nested", streamed == nested_result),
+    ("_array scalar wrapped in a list", array_result.get("sectionA", {}).get("products") == ["Oil"]),
+    ("_array falsy scalar becomes []", array_result.get("sectionA", {}).get("plants") == []),
+    ("None/empty values skipped", "cin" not in array_result.get("sectionA", {})
+        and "subsidiaries" not in array_result.get("sectionA", {})),
+    ("flat_to_nested_path returns a tuple", path == ("sectionA", "employees", "permanent", "male")),
+    ("flat_to_nested_path is cached", flat_to_nested_path("sectiona_employees_permanent_male") is path),
+    ("Mixed-case section prefix accepted", flat_to_nested_path("sectionA_cin") == ("sectionA", "cin")),
+    ("Other prefix spellings rejected",
+        flat_to_nested_path("SECTIONB_INDEPENDENTASSESSMENT_P5") == () and flat_to_nested_path("SectionB_x") == ()),
+    ("Unknown prefix unparseable", flat_to_nested_path("foo_bar") == () and flat_to_nested_path("sectionx_a") == ()),
+    ("precompute_paths skips unparseable keys", precomputed_count >= 1
+        and transform_flat_to_nested({"sectiona_cin": "L1"}) == {"sectionA": {"cin": "L1"}}),
+]
+
+failed = 0
+for check_name, result in api_checks:
+    status = "✅ PASS" if result else "❌ FAIL"
+    failed += not result
+    print(f"{status}: {check_name}")
+
+print("\n" + "=" * 80)
+print("TEST COMPLETE" if not failed else f"TEST FAILED ({failed} API check(s))")
+print("=" * 80)
+sys.exit(1 if failed else 0)
@@ -6,13 +6,42 @@ This module handles the transformation of Gemini's flat JSON output (with keys l
 the frontend expects (like {"sectionA": {"cin": "..."}}).
 """
 
-from typing import Dict, Any, List
+import sys
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
 import json
 
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
 
-def set_nested_value(obj: Dict[str, Any], path: List[str], value: Any) -> None:
+logger = logging.getLogger(__name__)
+
+
+# The JSON helpers shared with the backend: orjson when installed, stdlib json otherwise.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the same error.
+loads: Callable[[Union[str, bytes]], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def dump_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize `obj` (e.g. transformed output) to UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize `obj` to a JSON string (see dump_bytes)."""
+    return dump_bytes(obj, indent).decode()
+
+
+def set_nested_value(obj: Dict[str, Any], path: Sequence[str], value: Any) -> None:
     """
-    Set a value in a nested dictionary using a path list.
+    Set a value in a nested dictionary using a path sequence (list or tuple).
     
     Example:
         set_nested_value(obj, ["sectionA", "cin"], "L23201...")
@@ -20,400 +49,398 @@ def set_nested_value(obj: Dict[str, Any], path: List[str], value: Any) -> None:
     """
     current = obj
     for key in path[:-1]:
-        if key not in current:
-            current[key] = {}
-        current = current[key]
+        current = current.setdefault(key, {})
     current[path[-1]] = value
 
 
-def flat_to_nested_path(flat_key: str) -> List[str]:
+# Flat key prefix -> top-level frontend section. The prompts use "sectiona"; the frontend
+# spelling "sectionA" is accepted too. Any other prefix (e.g. "SECTIONA") is unparseable.
+_SECTION_MAP: Dict[str, str] = {
+    "sectiona": "sectionA",
+    "sectionb": "sectionB",
+    "sectionc": "sectionC",
+    "sectiond": "sectionD",
+    "sectione": "sectionE",
+    "sectionA": "sectionA",
+    "sectionB": "sectionB",
+    "sectionC": "sectionC",
+    "sectionD": "sectionD",
+    "sectionE": "sectionE",
+}
+
+
+# Known camelCase fields (lowercased flat-key token -> frontend name)
+_CAMEL_CASE_MAP: Dict[str, str] = {
+    # Section A
+    "policymatrix": "policyMatrix",
+    "entityname": "entityName",
+    "yearofincorporation": "yearOfIncorporation",
+    "registeredaddress": "registeredAddress",
+    "corporateaddress": "corporateAddress",
+    "financialyear": "financialYear",
+    "stockexchanges": "stockExchanges",
+    "paidupcapital": "paidUpCapital",
+    "contactperson": "contactPerson",
+    "reportingboundary": "reportingBoundary",
+    "businessactivities": "businessActivities",
+    "niccode": "nicCode",
+    "turnoverpercent": "turnoverPercent",
+    "boardofdirectors": "boardOfDirectors",
+    "totalprogrammes": "totalProgrammes",
+    "topicscovered": "topicsCovered",
+    "percentagecovered": "percentageCovered",
+    "approvedbyboard": "approvedByBoard",
+    "turnoverrate": "turnoverRate",
+    "healthinsurance": "healthInsurance",
+    "accidentinsurance": "accidentInsurance",
+    "maternitybenefit": "maternityBenefits",
+    "paternitybenefit": "paternityBenefits",
+    "daycare": "dayCare",
+    "currentfy": "currentFY",
+    "previousfy": "previousFY",
+    
+    # Section C - Principle fields
+    "percentagecoveredbytraining": "percentageCoveredByTraining",
+    "finespenalties": "finesPenalties",
+    "appealsoutstanding": "appealsOutstanding",
+    "anticorruptionpolicy": "antiCorruptionPolicy",
+    "weblink": "webLink",
+    "disciplinaryactions": "disciplinaryActions",
+    "conflictofinterestprocess": "conflictOfInterestProcess",
+    "conflictofinterestcomplaints": "conflictOfInterestComplaints",
+    "correctiveactions": "correctiveActions",
+    "accountspayabledays": "accountsPayableDays",
+    "opennessbusiness": "opennessBusiness",
+    "concentrationpurchases": "concentrationPurchases",
+    "tradinghousespercent": "tradingHousesPercent",
+    "dealerscount": "dealersCount",
+    "top10tradinghouses": "top10TradingHouses",
+    "concentrationsales": "concentrationSales",
+    "dealersdistributorspercent": "dealersDistributorsPercent",
+    "top10dealers": "top10Dealers",
+    "sharerpts": "shareRPTs",
+    "loansadvances": "loansAdvances",
+    "valuechainawareness": "valueChainAwareness",
+    "rdcapexinvestments": "rdCapexInvestments",
+    "improvementdetails": "improvementDetails",
+    "sustainablesourcing": "sustainableSourcing",
+    "proceduresinplace": "proceduresInPlace",
+    "percentagesustainablysourced": "percentageSustainablySourced",
+    "reclaimprocesses": "reclaimProcesses",
+    "wastecollectionplaninline": "wasteCollectionPlanInLine",
+    "lcadetails": "lcaDetails",
+    "recycledinputmaterial": "recycledInputMaterial",
+    "inputmaterial": "inputMaterial",
+    "employeewellbeing": "employeeWellbeing",
+    "workerwellbeing": "workerWellbeing",
+    "permanentmale": "permanentMale",
+    "permanentfemale": "permanentFemale",
+    "permanenttotal": "permanentTotal",
+    "othermale": "otherMale",
+    "otherfemale": "otherFemale",
+    "othertotal": "otherTotal",
+    "spendingonwellbeing": "spendingOnWellbeing",
+    "retirementbenefits": "retirementBenefits",
+    "employeespercent": "employeesPercent",
+    "workerspercent": "workersPercent",
+    "deducteddeposited": "deductedDeposited",
+    "accessibilityofworkplaces": "accessibilityOfWorkplaces",
+    "equalopportunitypolicy": "equalOpportunityPolicy",
+    "parentalleaverates": "parentalLeaveRates",
+    "permanentemployees": "permanentEmployees",
+    "permanentworkers": "permanentWorkers",
+    "returntoworkrate": "returnToWorkRate",
+    "retentionrate": "retentionRate",
+    "grievancemechanism": "grievanceMechanism",
+    "otherthanpermanentworkers": "otherThanPermanentWorkers",
+    "otherthanpermanentemployees": "otherThanPermanentEmployees",
+    "otherthanpermanent": "otherThanPermanent",
+    "valuechain": "valueChain",
+    "membershipunions": "membershipUnions",
+    "totalemployees": "totalEmployees",
+    "membersinunions": "membersInUnions",
+    "totalworkers": "totalWorkers",
+    "trainingdetails": "trainingDetails",
+    "healthsafety": "healthSafety",
+    "skillupgradation": "skillUpgradation",
+    "performancereviews": "performanceReviews",
+    "healthsafetymanagement": "healthSafetyManagement",
+    "safetyincidents": "safetyIncidents",
+    "currentyear": "currentYear",
+    "previousyear": "previousYear",
+    "safetymeasures": "safetyMeasures",
+    "lifeinsurance": "lifeInsurance",
+    "humanrightstraining": "humanRightsTraining",
+    "minimumwages": "minimumWages",
+    "medianremuneration": "medianRemuneration",
+    "grosswagesfemales": "grossWagesFemales",
+    "focalpointhumanrights": "focalPointHumanRights",
+    "grievancemechanisms": "grievanceMechanisms",
+    "sexualharassment": "sexualHarassment",
+    "poshcomplaints": "poshComplaints",
+    "totalcomplaints": "totalComplaints",
+    "mechanismspreventadverseconsequences": "mechanismsPreventAdverseConsequences",
+    "humanrightsincontracts": "humanRightsInContracts",
+    "childlabour": "childLabour",
+    "businessprocessmodified": "businessProcessModified",
+    "energyconsumption": "energyConsumption",
+    "nonrenewable": "nonRenewable",
+    "totalenergyconsumed": "totalEnergyConsumed",
+    "energyintensityperturnover": "energyIntensityPerTurnover",
+    "patscheme": "patScheme",
+    "patfacilities": "patFacilities",
+    "waterdetails": "waterDetails",
+    "surfacewater": "surfaceWater",
+    "groundwater": "groundwater",
+    "waterdischarge": "waterDischarge",
+    "notreatment": "noTreatment",
+    "withtreatment": "withTreatment",
+    "zeroliquiddischarge": "zeroLiquidDischarge",
+    "airemissions": "airEmissions",
+    "ghgemissions": "ghgEmissions",
+    "ghgreductionprojects": "ghgReductionProjects",
+    "wastemanagement": "wasteManagement",
+    "plasticwaste": "plasticWaste",
+    "wastepractices": "wastePractices",
+    "ecologicallysensitiveareas": "ecologicallySensitiveAreas",
+    "scope3emissions": "scope3Emissions",
+    # Principle 5 fields (Human Rights)
+    "remuneration": "remuneration",
+    "equaltominwage": "equalToMinWage",
+    "morethanminwage": "moreThanMinWage",
+    "keymanagerialpersonnel": "keyManagerialPersonnel",
+    "employeesotherthanbodandkmp": "employeesOtherThanBoDAndKMP",
+    "discriminationatworkplace": "discriminationAtWorkplace",
+    "forcedlabour": "forcedLabour",
+    "forcedinvoluntarylabour": "forcedInvoluntaryLabour",
+    "forcedlabourinvoluntarylabour": "forcedLabourInvoluntaryLabour",
+    "otherhumanrights": "otherHumanRights",
+    "complaintsaspercentfemale": "complaintsAsPercentFemale",
+    "complaintsupheld": "complaintsUpheld",
+    "humanrightsduediligence": "humanRightsDueDiligence",
+    "accessibilitydifferentlyabled": "accessibilityDifferentlyAbled",
+    "correctiveactionsvaluechain": "correctiveActionsValueChain",
+    # Principle 6 fields (Environment)
+    "renewable": "renewable",
+    "othersources": "otherSources",
+    "energyintensityppp": "energyIntensityPPP",
+    "energyintensityphysicaloutput": "energyIntensityPhysicalOutput",
+    "externalassessment": "externalAssessment",
+    "withdrawal": "withdrawal",
+    "thirdpartywater": "thirdPartyWater",
+    "seawaterdesalinated": "seawaterDesalinated",
+    "consumption": "consumption",
+    "waterintensityperturnover": "waterIntensityPerTurnover",
+    "waterintensityppp": "waterIntensityPPP",
+    "waterintensityphysicaloutput": "waterIntensityPhysicalOutput",
+    "thirdparties": "thirdParties",
+    "totalwaterdischarged": "totalWaterDischarged",
+    "scope1and2intensityperturnover": "scope1And2IntensityPerTurnover",
+    "scope1and2intensityphysicaloutput": "scope1And2IntensityPhysicalOutput",
+    "totalscope1and2": "totalScope1And2",
+    "ewaste": "eWaste",
+    "biomedicalwaste": "bioMedicalWaste",
+    "constructiondemolitionwaste": "constructionDemolitionWaste",
+    "batterywaste": "batteryWaste",
+    "radioactivewaste": "radioactiveWaste",
+    "otherhazardouswaste": "otherHazardousWaste",
+    "othernonhazardouswaste": "otherNonHazardousWaste",
+    "totalwaste": "totalWaste",
+    "wasteintensityperturnover": "wasteIntensityPerTurnover",
+    "wasteintensityppp": "wasteIntensityPPP",
+    "wasteintensityphysicaloutput": "wasteIntensityPhysicalOutput",
+    "recycled": "recycled",
+    "reused": "reused",
+    "otherrecovery": "otherRecovery",
+    "totalrecovered": "totalRecovered",
+    "incineration": "incineration",
+    "landfilling": "landfilling",
+    "otherdisposal": "otherDisposal",
+    "totaldisposed": "totalDisposed",
+    "ecologicallysensitivedetails": "ecologicallySensitiveDetails",
+    "environmentalimpactassessments": "environmentalImpactAssessments",
+    "environmentalcompliance": "environmentalCompliance",
+    "noncompliances": "nonCompliances",
+    "waterstressareas": "waterStressAreas",
+    "natureofoperations": "natureOfOperations",
+    "scope3emissionsperturnover": "scope3EmissionsPerTurnover",
+    "scope3intensityphysicaloutput": "scope3IntensityPhysicalOutput",
+    "biodiversityimpact": "biodiversityImpact",
+    "resourceefficiencyinitiatives": "resourceEfficiencyInitiatives",
+    "businesscontinuityplan": "businessContinuityPlan",
+    "valuechainenvironmentalimpact": "valueChainEnvironmentalImpact",
+    "valuechainpartnersassessed": "valueChainPartnersAssessed",
+    # Principle 7 fields (Public Policy)
+    "numberofaffiliations": "numberOfAffiliations",
+    "affiliationslist": "affiliationsList",
+    "anticompetitiveconduct": "antiCompetitiveConduct",
+    "publicpolicyadvocacy": "publicPolicyAdvocacy",
+    "policyadvocated": "policyAdvocated",
+    "methodresorted": "methodResorted",
+    "publicdomain": "publicDomain",
+    "frequencyofreview": "frequencyOfReview",
+    # Principle 8 fields (Inclusive Growth)
+    "socialimpactassessments": "socialImpactAssessments",
+    "rehabilitationresettlement": "rehabilitationResettlement",
+    "communitygrievancemechanism": "communityGrievanceMechanism",
+    "inputmaterialsourcing": "inputMaterialSourcing",
+    "neighboringdistricts": "neighboringDistricts",
+    "jobcreation": "jobCreation",
+    "semiurban": "semiUrban",
+    "metropolitan": "metropolitan",
+    "negativeimpactmitigation": "negativeImpactMitigation",
+    "csrprojects": "csrProjects",
+    "aspirationaldistrict": "aspirationalDistrict",
+    "amountspent": "amountSpent",
+    "preferentialprocurement": "preferentialProcurement",
+    "vulnerablegroups": "vulnerableGroups",
+    "procurementpercentage": "procurementPercentage",
+    "intellectualproperty": "intellectualProperty",
+    "ipdisputes": "ipDisputes",
+    "csrbeneficiaries": "csrBeneficiaries",
+    "percentvulnerable": "percentVulnerable",
+    # Principle 9 fields (Consumer Value)
+    "consumercomplaintmechanism": "consumerComplaintMechanism",
+    "productinformationpercentage": "productInformationPercentage",
+    "environmentalparameters": "environmentalParameters",
+    "safeusage": "safeUsage",
+    "consumercomplaints": "consumerComplaints",
+    "dataprivacy": "dataPrivacy",
+    "cybersecurity": "cyberSecurity",
+    "deliveryofessentialservices": "deliveryOfEssentialServices",
+    "restrictivetradepractices": "restrictiveTradePractices",
+    "unfairtradepractices": "unfairTradePractices",
+    "productrecalls": "productRecalls",
+    "voluntary": "voluntary",
+    "cybersecuritypolicy": "cyberSecurityPolicy",
+    "databreaches": "dataBreaches",
+    "numberofinstances": "numberOfInstances",
+    "impactonbusiness": "impactOnBusiness",
+    "turnoversafety": "turnoverSafety",
+    "environmentallysustainableproducts": "environmentallySustainableProducts",
+    "saferecyclableproducts": "safeRecyclableProducts",
+    "informationchannels": "informationChannels",
+    "consumersurveys": "consumerSurveys",
+    "trendsinsatisfaction": "trendsInSatisfaction",
+    "areasofimpact": "areasOfImpact",
+    # Other principles
+    "withindistrict": "withinDistrict",
+    "stakeholderidentification": "stakeholderIdentification",
+    "stakeholderengagement": "stakeholderEngagement",
+    "stakeholdergroup": "stakeholderGroup",
+    "vulnerablemarginalized": "vulnerableMarginalized",
+    "boardconsultation": "boardConsultation",
+    "stakeholderconsultationused": "stakeholderConsultationUsed",
+    # Principle 3 fields
+    "reviewed": "reviewed",
+    "totalrecordableinjuries": "totalRecordableInjuries",
+    "highconsequenceinjuries": "highConsequenceInjuries",
+    "complaintsworkingconditions": "complaintsWorkingConditions",
+    "workingconditions": "workingConditions",
+    "pendingresolution": "pendingResolution",
+    "statutoryduesvaluechain": "statutoryDuesValueChain",
+    "rehabilitation": "rehabilitation",
+    "totalaffected": "totalAffected",
+    "rehabilitated": "rehabilitated",
+    "transitionassistance": "transitionAssistance",
+    "valuechainassessment": "valueChainAssessment",
+    "healthsafetypractices": "healthSafetyPractices",
+    # Principle 4 fields
+    "vulnerableengagement": "vulnerableEngagement",
+    "vulnerablegroup": "vulnerableGroup",
+    "actiontaken": "actionTaken",
+}
+
+
+# Section C field names that may follow a qN token (qN_fieldName compound keys)
+_FIELD_NAME_CANDIDATES: FrozenSet[str] = frozenset({
+    # Principle 1 & 2
+    "percentagecoveredbytraining", "finespenalties", "appealsoutstanding",
+    "anticorruptionpolicy", "disciplinaryactions", "conflictofinterest",
+    "awarenessinitiatives", "accountspayabledays", "opennessbusiness",
+    "inputmaterialsourcing", "wasteintensity", "emissions", "biodiversity",
+    "waterusage", "energyconsumption", "operationalimpact", "rdcapexinvestments",
+    "sustainablesourcing", "reclaimprocesses", "epr", "lcadetails", "significantconcerns",
+    "recycledinputmaterial", "productsreclaimed", "reclaimedpercentage",
+    # Principle 3 & 4
+    "employeewellbeing", "workerwellbeing", "spendingonwellbeing", "retirementbenefits",
+    "accessibilityofworkplaces", "equalopportunitypolicy", "parentalleaverates",
+    "grievancemechanism", "membershipunions", "trainingdetails", "performancereviews",
+    "healthsafetymanagement", "safetyincidents", "safetymeasures", "complaintsworkingconditions",
+    "assessments", "correctiveactions", "lifeinsurance", "statutoryduesvaluechain",
+    "rehabilitation", "transitionassistance", "valuechainassessment",
+    "stakeholderidentification", "stakeholderengagement", "boardconsultation",
+    "stakeholderconsultationused", "vulnerableengagement",
+    # Principle 5 & 6
+    "remuneration", "minimumwages", "medianremuneration", "grosswagesfemales",
+    "focalpointhumanrights", "grievancemechanisms", "complaints", "poshcomplaints",
+    "mechanismspreventadverseconsequences", "humanrightsincontracts",
+    "businessprocessmodified", "humanrightsduediligence", "accessibilitydifferentlyabled",
+    "patscheme", "patfacilities", "waterdetails",
+    "waterdischarge", "zeroliquiddischarge", "airemissions", "ghgemissions",
+    "ghgreductionprojects", "wastemanagement", "wastepractices",
+    "ecologicallysensitiveareas", "ecologicallysensitivedetails",
+    "environmentalimpactassessments", "environmentalcompliance", "noncompliances",
+    "waterstressareas", "scope3emissions", "biodiversityimpact",
+    "resourceefficiencyinitiatives", "businesscontinuityplan",
+    "valuechainenvironmentalimpact", "valuechainpartnersassessed",
+    # Principle 7, 8, 9
+    "numberofaffiliations", "affiliationslist", "anticompetitiveconduct",
+    "publicpolicyadvocacy", "socialimpactassessments", "rehabilitationresettlement",
+    "communitygrievancemechanism", "jobcreation",
+    "negativeimpactmitigation", "csrprojects", "preferentialprocurement",
+    "vulnerablegroups", "procurementpercentage", "intellectualproperty",
+    "ipdisputes", "csrbeneficiaries", "consumercomplaintmechanism",
+    "productinformationpercentage", "consumercomplaints", "productrecalls",
+    "cybersecuritypolicy", "databreaches", "turnoversafety",
+    "informationchannels", "consumersurveys",
+    "correctiveactionsvaluechain",
+})
+
+
+@lru_cache(maxsize=4096)
+def _split_key(flat_key: str) -> Tuple[str, ...]:
+    """Cached `flat_key.split("_")` as a tuple, shared by every step that needs the tokens."""
+    return tuple(flat_key.split("_"))
+
+
+@lru_cache(maxsize=4096)
+def flat_to_nested_path(
+    flat_key: str,
+    _camel_get: Callable[[str], Optional[str]] = _CAMEL_CASE_MAP.get,
+    _is_candidate: Callable[[object], bool] = _FIELD_NAME_CANDIDATES.__contains__,
+    _section_get: Callable[[str], Optional[str]] = _SECTION_MAP.get,
+) -> Tuple[str, ...]:
     """
     Convert flat extraction key to nested path with proper camelCase.
     
     Examples:
-        "sectiona_cin" → ["sectionA", "cin"]
-        "sectiona_employees_permanent_male" → ["sectionA", "employees", "permanent", "male"]
-        "sectionb_policymatrix_p1_hasPolicy" → ["sectionB", "policyMatrix", "p1", "hasPolicy"]
-        "sectionc_principle1_essential_q1" → ["sectionC", "principle1", "essential", "q1"]
-    """
-    # Mapping for known camelCase fields
-    camel_case_map = {
-        # Section A
-        "policymatrix": "policyMatrix",
-        "entityname": "entityName",
-        "yearofincorporation": "yearOfIncorporation",
-        "registeredaddress": "registeredAddress",
-        "corporateaddress": "corporateAddress",
-        "financialyear": "financialYear",
-        "stockexchanges": "stockExchanges",
-        "paidupcapital": "paidUpCapital",
-        "contactperson": "contactPerson",
-        "reportingboundary": "reportingBoundary",
-        "businessactivities": "businessActivities",
-        "niccode": "nicCode",
-        "turnoverpercent": "turnoverPercent",
-        "boardofdirectors": "boardOfDirectors",
-        "totalprogrammes": "totalProgrammes",
-        "topicscovered": "topicsCovered",
-        "percentagecovered": "percentageCovered",
-        "approvedbyboard": "approvedByBoard",
-        "turnoverrate": "turnoverRate",
-        "healthinsurance": "healthInsurance",
-        "accidentinsurance": "accidentInsurance",
-        "maternitybenefit": "maternityBenefits",
-        "paternitybenefit": "paternityBenefits",
-        "daycare": "dayCare",
-        "currentfy": "currentFY",
-        "previousfy": "previousFY",
-        
-        # Section C - Principle fields
-        "percentagecoveredbytraining": "percentageCoveredByTraining",
-        "finespenalties": "finesPenalties",
-        "appealsoutstanding": "appealsOutstanding",
-        "anticorruptionpolicy": "antiCorruptionPolicy",
-        "weblink": "webLink",
-        "disciplinaryactions": "disciplinaryActions",
-        "conflictofinterestprocess": "conflictOfInterestProcess",
-        "conflictofinterestcomplaints": "conflictOfInterestComplaints",
-        "correctiveactions": "correctiveActions",
-        "accountspayabledays": "accountsPayableDays",
-        "opennessbusiness": "opennessBusiness",
-        "concentrationpurchases": "concentrationPurchases",
-        "tradinghousespercent": "tradingHousesPercent",
-        "dealerscount": "dealersCount",
-        "top10tradinghouses": "top10TradingHouses",
-        "concentrationsales": "concentrationSales",
-        "dealersdistributorspercent": "dealersDistributorsPercent",
-        "top10dealers": "top10Dealers",
-        "sharerpts": "shareRPTs",
-        "loansadvances": "loansAdvances",
-        "valuechainawareness": "valueChainAwareness",
-        "rdcapexinvestments": "rdCapexInvestments",
-        "improvementdetails": "improvementDetails",
-        "sustainablesourcing": "sustainableSourcing",
-        "proceduresinplace": "proceduresInPlace",
-        "percentagesustainablysourced": "percentageSustainablySourced",
-        "reclaimprocesses": "reclaimProcesses",
-        "wastecollectionplaninline": "wasteCollectionPlanInLine",
-        "lcadetails": "lcaDetails",
-        "recycledinputmaterial": "recycledInputMaterial",
-        "inputmaterial": "inputMaterial",
-        "employeewellbeing": "employeeWellbeing",
-        "workerwellbeing": "workerWellbeing",
-        "permanentmale": "permanentMale",
-        "permanentfemale": "permanentFemale",
-        "permanenttotal": "permanentTotal",
-        "othermale": "otherMale",
-        "otherfemale": "otherFemale",
-        "othertotal": "otherTotal",
-        "spendingonwellbeing": "spendingOnWellbeing",
-        "retirementbenefits": "retirementBenefits",
-        "employeespercent": "employeesPercent",
-        "workerspercent": "workersPercent",
-        "deducteddeposited": "deductedDeposited",
-        "accessibilityofworkplaces": "accessibilityOfWorkplaces",
-        "equalopportunitypolicy": "equalOpportunityPolicy",
-        "parentalleaverates": "parentalLeaveRates",
-        "permanentemployees": "permanentEmployees",
-        "permanentworkers": "permanentWorkers",
-        "returntoworkrate": "returnToWorkRate",
-        "retentionrate": "retentionRate",
-        "grievancemechanism": "grievanceMechanism",
-        "otherthanpermanentworkers": "otherThanPermanentWorkers",
-        "otherthanpermanentemployees": "otherThanPermanentEmployees",
-        "otherthanpermanent": "otherThanPermanent",
-        "valuechain": "valueChain",
-        "membershipunions": "membershipUnions",
-        "totalemployees": "totalEmployees",
-        "membersinunions": "membersInUnions",
-        "totalworkers": "totalWorkers",
-        "trainingdetails": "trainingDetails",
-        "healthsafety": "healthSafety",
-        "skillupgradation": "skillUpgradation",
-        "performancereviews": "performanceReviews",
-        "healthsafetymanagement": "healthSafetyManagement",
-        "safetyincidents": "safetyIncidents",
-        "currentyear": "currentYear",
-        "previousyear": "previousYear",
-        "safetymeasures": "safetyMeasures",
-        "lifeinsurance": "lifeInsurance",
-        "humanrightstraining": "humanRightsTraining",
-        "minimumwages": "minimumWages",
-        "medianremuneration": "medianRemuneration",
-        "grosswagesfemales": "grossWagesFemales",
-        "focalpointhumanrights": "focalPointHumanRights",
-        "grievancemechanisms": "grievanceMechanisms",
-        "sexualharassment": "sexualHarassment",
-        "poshcomplaints": "poshComplaints",
-        "totalcomplaints": "totalComplaints",
-        "mechanismspreventadverseconsequences": "mechanismsPreventAdverseConsequences",
-        "humanrightsincontracts": "humanRightsInContracts",
-        "childlabour": "childLabour",
-        "businessprocessmodified": "businessProcessModified",
-        "energyconsumption": "energyConsumption",
-        "nonrenewable": "nonRenewable",
-        "totalenergyconsumed": "totalEnergyConsumed",
-        "energyintensityperturnover": "energyIntensityPerTurnover",
-        "patscheme": "patScheme",
-        "patfacilities": "patFacilities",
-        "waterdetails": "waterDetails",
-        "surfacewater": "surfaceWater",
-        "groundwater": "groundWater",
-        "waterdischarge": "waterDischarge",
-        "notreatment": "noTreatment",
-        "withtreatment": "withTreatment",
-        "zeroliquiddischarge": "zeroLiquidDischarge",
-        "airemissions": "airEmissions",
-        "ghgemissions": "ghgEmissions",
-        "ghgreductionprojects": "ghgReductionProjects",
-        "wastemanagement": "wasteManagement",
-        "plasticwaste": "plasticWaste",
-        "wastepractices": "wastePractices",
-        "ecologicallysensitiveareas": "ecologicallySensitiveAreas",
-        "scope3emissions": "scope3Emissions",
-        # Principle 5 fields (Human Rights)
-        "remuneration": "remuneration",
-        "minimumwages": "minimumWages",
-        "equaltominwage": "equalToMinWage",
-        "morethanminwage": "moreThanMinWage",
-        "medianremuneration": "medianRemuneration",
-        "keymanagerialpersonnel": "keyManagerialPersonnel",
-        "employeesotherthanbodandkmp": "employeesOtherThanBoDAndKMP",
-        "grosswagesfemales": "grossWagesFemales",
-        "focalpointhumanrights": "focalPointHumanRights",
-        "grievancemechanisms": "grievanceMechanisms",
-        "sexualharassment": "sexualHarassment",
-        "discriminationatworkplace": "discriminationAtWorkplace",
-        "childlabour": "childLabour",
-        "forcedlabour": "forcedLabour",
-        "forcedinvoluntarylabour": "forcedInvoluntaryLabour",
-        "forcedlabourinvoluntarylabour": "forcedLabourInvoluntaryLabour",
-        "otherhumanrights": "otherHumanRights",
-        "poshcomplaints": "poshComplaints",
-        "complaintsaspercentfemale": "complaintsAsPercentFemale",
-        "complaintsupheld": "complaintsUpheld",
-        "mechanismspreventadverseconsequences": "mechanismsPreventAdverseConsequences",
-        "humanrightsincontracts": "humanRightsInContracts",
-        "businessprocessmodified": "businessProcessModified",
-        "humanrightsduediligence": "humanRightsDueDiligence",
-        "accessibilitydifferentlyabled": "accessibilityDifferentlyAbled",
-        "correctiveactionsvaluechain": "correctiveActionsValueChain",
-        # Principle 6 fields (Environment)
-        "energyconsumption": "energyConsumption",
-        "renewable": "renewable",
-        "nonrenewable": "nonRenewable",
-        "othersources": "otherSources",
-        "totalenergyconsumed": "totalEnergyConsumed",
-        "energyintensityperturnover": "energyIntensityPerTurnover",
-        "energyintensityppp": "energyIntensityPPP",
-        "energyintensityphysicaloutput": "energyIntensityPhysicalOutput",
-        "externalassessment": "externalAssessment",
-        "patscheme": "patScheme",
-        "patfacilities": "patFacilities",
-        "waterdetails": "waterDetails",
-        "withdrawal": "withdrawal",
-        "surfacewater": "surfaceWater",
-        "groundwater": "groundwater",
-        "thirdpartywater": "thirdPartyWater",
-        "seawaterdesalinated": "seawaterDesalinated",
-        "consumption": "consumption",
-        "waterintensityperturnover": "waterIntensityPerTurnover",
-        "waterintensityppp": "waterIntensityPPP",
-        "waterintensityphysicaloutput": "waterIntensityPhysicalOutput",
-        "waterdischarge": "waterDischarge",
-        "notreatment": "noTreatment",
-        "withtreatment": "withTreatment",
-        "thirdparties": "thirdParties",
-        "totalwaterdischarged": "totalWaterDischarged",
-        "zeroliquiddischarge": "zeroLiquidDischarge",
-        "airemissions": "airEmissions",
-        "ghgemissions": "ghgEmissions",
-        "scope1and2intensityperturnover": "scope1And2IntensityPerTurnover",
-        "scope1and2intensityphysicaloutput": "scope1And2IntensityPhysicalOutput",
-        "totalscope1and2": "totalScope1And2",
-        "ghgreductionprojects": "ghgReductionProjects",
-        "wastemanagement": "wasteManagement",
-        "ewaste": "eWaste",
-        "biomedicalwaste": "bioMedicalWaste",
-        "constructiondemolitionwaste": "constructionDemolitionWaste",
-        "batterywaste": "batteryWaste",
-        "radioactivewaste": "radioactiveWaste",
-        "otherhazardouswaste": "otherHazardousWaste",
-        "othernonhazardouswaste": "otherNonHazardousWaste",
-        "totalwaste": "totalWaste",
-        "wasteintensityperturnover": "wasteIntensityPerTurnover",
-        "wasteintensityppp": "wasteIntensityPPP",
-        "wasteintensityphysicaloutput": "wasteIntensityPhysicalOutput",
-        "recycled": "recycled",
-        "reused": "reused",
-        "otherrecovery": "otherRecovery",
-        "totalrecovered": "totalRecovered",
-        "incineration": "incineration",
-        "landfilling": "landfilling",
-        "otherdisposal": "otherDisposal",
-        "totaldisposed": "totalDisposed",
-        "ecologicallysensitivedetails": "ecologicallySensitiveDetails",
-        "environmentalimpactassessments": "environmentalImpactAssessments",
-        "environmentalcompliance": "environmentalCompliance",
-        "noncompliances": "nonCompliances",
-        "waterstressareas": "waterStressAreas",
-        "natureofoperations": "natureOfOperations",
-        "scope3emissionsperturnover": "scope3EmissionsPerTurnover",
-        "scope3intensityphysicaloutput": "scope3IntensityPhysicalOutput",
-        "biodiversityimpact": "biodiversityImpact",
-        "resourceefficiencyinitiatives": "resourceEfficiencyInitiatives",
-        "businesscontinuityplan": "businessContinuityPlan",
-        "valuechainenvironmentalimpact": "valueChainEnvironmentalImpact",
-        "valuechainpartnersassessed": "valueChainPartnersAssessed",
-        # Principle 7 fields (Public Policy)
-        "numberofaffiliations": "numberOfAffiliations",
-        "affiliationslist": "affiliationsList",
-        "anticompetitiveconduct": "antiCompetitiveConduct",
-        "publicpolicyadvocacy": "publicPolicyAdvocacy",
-        "policyadvocated": "policyAdvocated",
-        "methodresorted": "methodResorted",
-        "publicdomain": "publicDomain",
-        "frequencyofreview": "frequencyOfReview",
-        # Principle 8 fields (Inclusive Growth)
-        "socialimpactassessments": "socialImpactAssessments",
-        "rehabilitationresettlement": "rehabilitationResettlement",
-        "communitygrievancemechanism": "communityGrievanceMechanism",
-        "inputmaterialsourcing": "inputMaterialSourcing",
-        "neighboringdistricts": "neighboringDistricts",
-        "jobcreation": "jobCreation",
-        "semiurban": "semiUrban",
-        "metropolitan": "metropolitan",
-        "negativeimpactmitigation": "negativeImpactMitigation",
-        "csrprojects": "csrProjects",
-        "aspirationaldistrict": "aspirationalDistrict",
-        "amountspent": "amountSpent",
-        "preferentialprocurement": "preferentialProcurement",
-        "vulnerablegroups": "vulnerableGroups",
-        "procurementpercentage": "procurementPercentage",
-        "intellectualproperty": "intellectualProperty",
-        "ipdisputes": "ipDisputes",
-        "csrbeneficiaries": "csrBeneficiaries",
-        "percentvulnerable": "percentVulnerable",
-        # Principle 9 fields (Consumer Value)
-        "consumercomplaintmechanism": "consumerComplaintMechanism",
-        "productinformationpercentage": "productInformationPercentage",
-        "environmentalparameters": "environmentalParameters",
-        "safeusage": "safeUsage",
-        "consumercomplaints": "consumerComplaints",
-        "dataprivacy": "dataPrivacy",
-        "cybersecurity": "cyberSecurity",
-        "deliveryofessentialservices": "deliveryOfEssentialServices",
-        "restrictivetradepractices": "restrictiveTradePractices",
-        "unfairtradepractices": "unfairTradePractices",
-        "productrecalls": "productRecalls",
-        "voluntary": "voluntary",
-        "cybersecuritypolicy": "cyberSecurityPolicy",
-        "databreaches": "dataBreaches",
-        "numberofinstances": "numberOfInstances",
-        "impactonbusiness": "impactOnBusiness",
-        "turnoversafety": "turnoverSafety",
-        "environmentallysustainableproducts": "environmentallySustainableProducts",
-        "saferecyclableproducts": "safeRecyclableProducts",
-        "informationchannels": "informationChannels",
-        "consumersurveys": "consumerSurveys",
-        "trendsinsatisfaction": "trendsInSatisfaction",
-        "areasofimpact": "areasOfImpact",
-        # Other principles
-        "numberofaffiliations": "numberOfAffiliations",
-        "affiliationslist": "affiliationsList",
-        "anticompetitiveconduct": "antiCompetitiveConduct",
-        "publicpolicyadvocacy": "publicPolicyAdvocacy",
-        "policyadvocated": "policyAdvocated",
-        "methodresorted": "methodResorted",
-        "publicdomain": "publicDomain",
-        "frequencyofreview": "frequencyOfReview",
-        "socialimpactassessments": "socialImpactAssessments",
-        "rehabilitationresettlement": "rehabilitationResettlement",
-        "communitygrievancemechanism": "communityGrievanceMechanism",
-        "inputmaterialsourcing": "inputMaterialSourcing",
-        "withindistrict": "withinDistrict",
-        "jobcreation": "jobCreation",
-        "semiurban": "semiUrban",
-        "csrprojects": "csrProjects",
-        "aspirationaldistrict": "aspirationalDistrict",
-        "amountspent": "amountSpent",
-        "consumercomplaintmechanism": "consumerComplaintMechanism",
-        "productinformationpercentage": "productInformationPercentage",
-        "environmentalparameters": "environmentalParameters",
-        "safeusage": "safeUsage",
-        "consumercomplaints": "consumerComplaints",
-        "dataprivacy": "dataPrivacy",
-        "cybersecurity": "cyberSecurity",
-        "productrecalls": "productRecalls",
-        "cybersecuritypolicy": "cyberSecurityPolicy",
-        "databreaches": "dataBreaches",
-        "numberofinstances": "numberOfInstances",
-        "informationchannels": "informationChannels",
-        "stakeholderidentification": "stakeholderIdentification",
-        "stakeholderengagement": "stakeholderEngagement",
-        "stakeholdergroup": "stakeholderGroup",
-        "vulnerablemarginalized": "vulnerableMarginalized",
-        "boardconsultation": "boardConsultation",
-        "stakeholderconsultationused": "stakeholderConsultationUsed",
-        # Principle 3 fields
-        "employeewellbeing": "employeeWellbeing",
-        "workerwellbeing": "workerWellbeing",
-        "spendingonwellbeing": "spendingOnWellbeing",
-        "retirementbenefits": "retirementBenefits",
-        "accessibilityofworkplaces": "accessibilityOfWorkplaces",
-        "equalopportunitypolicy": "equalOpportunityPolicy",
-        "parentalleaverates": "parentalLeaveRates",
-        "returntoworkrate": "returnToWorkRate",
-        "retentionrate": "retentionRate",
-        "grievancemechanism": "grievanceMechanism",
-        "membershipunions": "membershipUnions",
-        "membersinunions": "membersInUnions",
-        "trainingdetails": "trainingDetails",
-        "healthsafety": "healthSafety",
-        "skillupgradation": "skillUpgradation",
-        "performancereviews": "performanceReviews",
-        "reviewed": "reviewed",
-        "healthsafetymanagement": "healthSafetyManagement",
-        "safetyincidents": "safetyIncidents",
-        "totalrecordableinjuries": "totalRecordableInjuries",
-        "highconsequenceinjuries": "highConsequenceInjuries",
-        "safetymeasures": "safetyMeasures",
-        "complaintsworkingconditions": "complaintsWorkingConditions",
-        "workingconditions": "workingConditions",
-        "pendingresolution": "pendingResolution",
-        "correctiveactions": "correctiveActions",
-        "lifeinsurance": "lifeInsurance",
-        "statutoryduesvaluechain": "statutoryDuesValueChain",
-        "rehabilitation": "rehabilitation",
-        "totalaffected": "totalAffected",
-        "rehabilitated": "rehabilitated",
-        "transitionassistance": "transitionAssistance",
-        "valuechainassessment": "valueChainAssessment",
-        "healthsafetypractices": "healthSafetyPractices",
-        "correctiveactionsvaluechain": "correctiveActionsValueChain",
-        # Principle 4 fields
-        "vulnerableengagement": "vulnerableEngagement",
-        "vulnerablegroup": "vulnerableGroup",
-        "actiontaken": "actionTaken",
-    }
+        "sectiona_cin" → ("sectionA", "cin")
+        "sectiona_employees_permanent_male" → ("sectionA", "employees", "permanent", "male")
+        "sectionb_policymatrix_p1_hasPolicy" → ("sectionB", "policyMatrix", "p1", "hasPolicy")
+        "sectionc_principle1_essential_q1" → ("sectionC", "principle1", "essential", "q1")
     
-    parts = flat_key.split("_")
+    Memoized: BRSR keys are a fixed vocabulary that recurs in every extraction, so the
+    path is returned as a (shared, immutable) tuple; unparseable keys give ().
+    The underscore parameters bind the lookup tables as fast locals; don't pass them.
+    """
+    parts: Tuple[str, ...] = _split_key(flat_key)
     
     if not parts:
-        return []
+        return ()
     
-    # Handle section prefix (sectiona → sectionA, sectionb → sectionB, etc.)
-    section = parts[0]
-    if section.startswith("section"):
-        section_letter = section[-1].upper()
-        nested_path = [f"section{section_letter}"]
-        remaining = parts[1:]
-    else:
-        return []
+    # Handle section prefix (sectiona → sectionA, sectionb → sectionB, etc.; "sectionA" works too)
+    nested_section = _section_get(parts[0])
+    if nested_section is None:
+        return ()
+    nested_path: List[str] = [nested_section]
+    remaining = parts[1:]
     
     # Process remaining parts
+    append = nested_path.append
+    n = len(remaining)
     i = 0
-    while i < len(remaining):
+    while i < n:
         part = remaining[i]
         
         # Skip array markers
@@ -423,86 +450,71 @@ def flat_to_nested_path(flat_key: str) -> List[str]:
         
         # Special handling for Section C: Detect qN_fieldName pattern
         # If current part matches qN (q1, q2, etc.) and there's a next part
-        if part.startswith("q") and len(part) <= 3 and part[1:].isdigit() and i + 1 < len(remaining):
+        # (character checks, no slicing: most tokens fail on the first character)
+        if (part and part[0] == "q" and 2 <= len(part) <= 3 and part[1].isdigit()
+                and (len(part) == 2 or part[2].isdigit()) and i + 1 < n):
             # Peek at next part to see if it's a field name (not a category like boardofdirectors)
             next_part = remaining[i + 1]
-            # Check if next_part is likely a field name by checking if it's in camel_case_map
-            # or if it's a known Section C field pattern
-            field_name_candidates = [
-                # Principle 1 & 2
-                "percentagecoveredbytraining", "finespenalties", "appealsoutstanding", 
-                "anticorruptionpolicy", "disciplinaryactions", "conflictofinterest",
-                "awarenessinitiatives", "accountspayabledays", "opennessbusiness",
-                "inputmaterialsourcing", "wasteintensity", "emissions", "biodiversity",
-                "waterusage", "energyconsumption", "operationalimpact", "rdcapexinvestments",
-                "sustainablesourcing", "reclaimprocesses", "epr", "lcadetails", "significantconcerns",
-                "recycledinputmaterial", "productsreclaimed", "reclaimedpercentage",
-                # Principle 3 & 4
-                "employeewellbeing", "workerwellbeing", "spendingonwellbeing", "retirementbenefits",
-                "accessibilityofworkplaces", "equalopportunitypolicy", "parentalleaverates",
-                "grievancemechanism", "membershipunions", "trainingdetails", "performancereviews",
-                "healthsafetymanagement", "safetyincidents", "safetymeasures", "complaintsworkingconditions",
-                "assessments", "correctiveactions", "lifeinsurance", "statutoryduesvaluechain",
-                "rehabilitation", "transitionassistance", "valuechainassessment",
-                "stakeholderidentification", "stakeholderengagement", "boardconsultation",
-                "stakeholderconsultationused", "vulnerableengagement",
-                # Principle 5 & 6
-                "remuneration", "minimumwages", "medianremuneration", "grosswagesfemales",
-                "focalpointhumanrights", "grievancemechanisms", "complaints", "poshcomplaints",
-                "mechanismspreventadverseconsequences", "humanrightsincontracts",
-                "businessprocessmodified", "humanrightsduediligence", "accessibilitydifferentlyabled",
-                "energyconsumption", "patscheme", "patfacilities", "waterdetails",
-                "waterdischarge", "zeroliquiddischarge", "airemissions", "ghgemissions",
-                "ghgreductionprojects", "wastemanagement", "wastepractices",
-                "ecologicallysensitiveareas", "ecologicallysensitivedetails",
-                "environmentalimpactassessments", "environmentalcompliance", "noncompliances",
-                "waterstressareas", "scope3emissions", "biodiversityimpact",
-                "resourceefficiencyinitiatives", "businesscontinuityplan",
-                "valuechainenvironmentalimpact", "valuechainpartnersassessed",
-                # Principle 7, 8, 9
-                "numberofaffiliations", "affiliationslist", "anticompetitiveconduct",
-                "publicpolicyadvocacy", "socialimpactassessments", "rehabilitationresettlement",
-                "communitygrievancemechanism", "inputmaterialsourcing", "jobcreation",
-                "negativeimpactmitigation", "csrprojects", "preferentialprocurement",
-                "vulnerablegroups", "procurementpercentage", "intellectualproperty",
-                "ipdisputes", "csrbeneficiaries", "consumercomplaintmechanism",
-                "productinformationpercentage", "consumercomplaints", "productrecalls",
-                "cybersecuritypolicy", "databreaches", "turnoversafety",
-                "informationchannels", "consumersurveys",
-                "healthsafetymanagement", "safetyincidents", "safetymeasures", "complaintsworkingconditions",
-                "assessments", "correctiveactions", "lifeinsurance", "statutoryduesvaluechain",
-                "rehabilitation", "transitionassistance", "valuechainassessment", "correctiveactionsvaluechain",
-                "stakeholderidentification", "stakeholderengagement", "boardconsultation",
-                "stakeholderconsultationused", "vulnerableengagement"
-            ]
+            # Check if next_part is likely a field name by checking if it's in _CAMEL_CASE_MAP
+            # or if it's a known Section C field pattern. Keys are mostly lowercase already,
+            # so try the map before paying for lower().
+            field_camel = _camel_get(next_part)
+            if field_camel is None:
+                lower_next = next_part.lower()
+                if _is_candidate(lower_next):
+                    # Apply camelCase to the field part only
+                    field_camel = _camel_get(lower_next)
+                    if field_camel is None:
+                        # Convert field name to camelCase manually
+                        field_camel = ''.join(word.capitalize() for word in next_part.split('_'))
+                        field_camel = field_camel[0].lower() + field_camel[1:] if field_camel else field_camel
             
-            if next_part.lower() in field_name_candidates or next_part in camel_case_map:
+            if field_camel is not None:
                 # Combine qN + fieldName as a single compound key
-                compound_key = part + "_" + next_part
-                # Apply camelCase to the field part only
-                if next_part.lower() in camel_case_map:
-                    compound_key = part + "_" + camel_case_map[next_part.lower()]
-                else:
-                    # Convert field name to camelCase manually
-                    field_camel = ''.join(word.capitalize() for word in next_part.split('_'))
-                    field_camel = field_camel[0].lower() + field_camel[1:] if field_camel else field_camel
-                    compound_key = part + "_" + field_camel
-                
-                nested_path.append(compound_key)
+                append(part + "_" + field_camel)
                 i += 2  # Skip both qN and fieldName parts
                 continue
         
-        # Apply camelCase mapping if exists
-        lower_part = part.lower()
-        if lower_part in camel_case_map:
-            nested_path.append(camel_case_map[lower_part])
-        else:
-            # Keep as-is (for things like p1, q1, principle1, essential, leadership, etc.)
-            nested_path.append(part)
+        # Apply camelCase mapping if exists; otherwise keep as-is
+        # (for things like p1, q1, principle1, essential, leadership, etc.)
+        append(_camel_get(part) or _camel_get(part.lower()) or part)
         
         i += 1
     
-    return nested_path
+    # Intern the components: split tokens and qN compounds are fresh strings, and the same
+    # names recur across many keys and every document's nested dicts
+    return tuple(map(sys.intern, nested_path))
+
+
+@lru_cache(maxsize=4096)
+def _insert_plan(flat_key: str) -> Optional[Tuple[Tuple[str, ...], str, bool]]:
+    """Cached (parent keys, leaf key, is_array) plan for a flat key; None if unparseable.
+    
+    is_array marks keys ending in the `_array` marker (dropped from the path itself).
+    """
+    path = flat_to_nested_path(flat_key)
+    if not path:
+        return None
+    return path[:-1], path[-1], _split_key(flat_key)[-1] == "array"
+
+
+# Insert plans precomputed for the known BRSR key vocabulary (see precompute_paths);
+# a plain dict hit, with _insert_plan as the fallback for keys seen only at runtime
+_PRECOMPUTED_PLANS: Dict[str, Tuple[Tuple[str, ...], str, bool]] = {}
+
+
+def precompute_paths(flat_keys: Iterable[str]) -> int:
+    """
+    Precompute nested paths for known flat keys (e.g. every key the extraction prompts ask for),
+    so transforming a document resolves them with a single dict lookup.
+    
+    Returns the number of keys precomputed; unparseable keys are skipped.
+    """
+    for flat_key in flat_keys:
+        plan = _insert_plan(flat_key)
+        if plan is not None:
+            _PRECOMPUTED_PLANS[flat_key] = plan
+    return len(_PRECOMPUTED_PLANS)
 
 
 def transform_flat_to_nested(flat_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -519,52 +531,78 @@ def transform_flat_to_nested(flat_data: Dict[str, Any]) -> Dict[str, Any]:
         Input:  {"sectiona_cin": "L23201...", "sectiona_employees_permanent_male": "3424"}
         Output: {"sectionA": {"cin": "L23201...", "employees": {"permanent": {"male": "3424"}}}}
     """
-    nested_data = {}
+    return transform_flat_items(flat_data.items())
+
+
+def transform_flat_items(items: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+    """
+    Transform a stream of (flat_key, value) pairs to the nested frontend structure.
     
-    for flat_key, value in flat_data.items():
-        # Skip None or empty values if desired (optional)
-        if value is None or value == "":
+    Same rules as transform_flat_to_nested, but the pairs are consumed one at a time, so a
+    caller parsing a large response incrementally never needs to build the flat dict.
+    """
+    nested_data: Dict[str, Any] = {}
+    plans_get = _PRECOMPUTED_PLANS.get
+    
+    for flat_key, value in items:
+        # Skip None or empty values if desired (optional); one tuple-contains check
+        # (0/False/[] are kept, exactly as before)
+        if value in (None, ""):
             continue
         
-        # Convert flat key to nested path
-        path = flat_to_nested_path(flat_key)
+        # Convert flat key to its (parent keys, leaf key) insert plan: precomputed or cached
+        plan = plans_get(flat_key)
+        if plan is None:
+            plan = _insert_plan(flat_key)
         
-        if not path:
-            print(f"Warning: Could not parse flat key: {flat_key}")
+        if plan is None:
+            logger.warning("Could not parse flat key: %s", flat_key)
             continue
+        parents, leaf, is_array = plan
         
         # Handle arrays: keys ending in _array should have their values as arrays
-        if flat_key.endswith("_array"):
-            # Ensure value is a list
-            if not isinstance(value, list):
-                value = [value] if value else []
+        if is_array and not isinstance(value, list):
+            value = [value] if value else []
         
-        # Set the value in nested structure
-        set_nested_value(nested_data, path, value)
+        # Set the value in nested structure: walk/create parents, then assign the leaf
+        node: Dict[str, Any] = nested_data
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
     
     return nested_data
 
 
 def merge_nested_data(base: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Deep merge updates into base dictionary.
+    Deep merge updates into base dictionary, in place.
+    
+    Sub-dicts of `updates` are attached to `base` by reference (not copied), so
+    callers must not reuse `updates` afterwards.
     
     Args:
-        base: Base dictionary (can be empty {})
+        base: Base dictionary (can be empty {}); modified in place
         updates: Updates to merge in
     
     Returns:
-        Merged dictionary
+        `base`, merged
     """
-    result = base.copy()
-    
-    for key, value in updates.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_nested_data(result[key], value)
-        else:
-            result[key] = value
+    # Iterative walk over (destination, source) dict pairs; no recursion, no copies
+    stack: List[Tuple[Dict[str, Any], Dict[str, Any]]] = [(base, updates)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            # Chunks mostly own disjoint subtrees: attach those without descending
+            if key not in dst:
+                dst[key] = value
+                continue
+            current = dst[key]
+            if current.__class__ is dict and value.__class__ is dict:
+                stack.append((current, value))
+            else:
+                dst[key] = value
     
-    return result
+    return base
 
 
 # Example usage and testing
@@ -585,11 +623,11 @@ if __name__ == "__main__":
     }
     
     print("=== Sample Flat Data ===")
-    print(json.dumps(sample_flat_data, indent=2))
+    print(dumps(sample_flat_data, indent=True))
     
     print("\n=== Transformed Nested Data ===")
     nested = transform_flat_to_nested(sample_flat_data)
-    print(json.dumps(nested, indent=2))
+    print(dumps(nested, indent=True))
     
     print("\n=== Path Conversion Examples ===")
     test_keys = [